@@ -0,0 +1,207 @@
+"""
+alert_engine.py
+
+This module provides batch evaluation of price alert rules against live price updates.
+
+Every rule is reduced to an absolute trigger level (percent-move rules are converted using their reference price).
+Per symbol, "above" levels and "below" levels are kept in sorted arrays arranged so that the rules a price triggers
+always form the tail of the array. Evaluating a price update is one binary search per side plus removing the
+triggered tail, so the cost depends on the number of updates and fired rules, not on the number of rules.
+
+- AlertEngine: In-memory sorted-threshold index of active rules.
+- AlertScheduler: Subscribes to the price hub for symbols with active rules and records fired alerts.
+- alert_engine / alert_scheduler: Shared instances.
+"""
+import asyncio
+import os
+import threading
+from bisect import bisect_left, insort
+from app.core.database import SessionLocal
+from app.core.crud_alert import get_active_alert_rules, record_fired_alerts
+from app.core.price_stream import price_hub, Subscription
+#------------------------------------------------------------------------
+
+ALERT_FEED_RETRY_SECONDS = float(os.getenv("ALERT_FEED_RETRY_SECONDS", 30))
+
+#------------------------------------------------------------------------
+class _SymbolRules:
+    def __init__(self):
+        # "above" rules fire when price >= level; keys are -level ascending, so fired rules are a tail.
+        self.above = []
+        # "below" rules fire when price <= level; keys are level ascending, so fired rules are a tail.
+        self.below = []
+
+    def __len__(self):
+        return len(self.above) + len(self.below)
+
+class AlertEngine:
+    """
+    Sorted-threshold index of active alert rules, thread-safe.
+    """
+    def __init__(self):
+        self._symbols = {}
+        self._rules = {}  # rule_id -> (symbol, side, key)
+        self._lock = threading.Lock()
+
+    def load(self, rules: list):
+        """
+        Replace the index with the given rules.
+
+        Args:
+            rules (list[AlertRule]): Active rules.
+        """
+        with self._lock:
+            self._symbols, self._rules = {}, {}
+        for rule in rules:
+            self.add(rule.id, rule.stock_symbol, rule.kind, rule.level)
+
+    def add(self, rule_id: int, symbol: str, kind: str, level: float):
+        """
+        Index a rule.
+
+        Args:
+            rule_id (int): The rule's ID.
+            symbol (str): Watched symbol.
+            kind (str): Rule kind; 'above' and 'pct_up' fire on rises, 'below' and 'pct_down' on falls.
+            level (float): Absolute trigger price.
+        """
+        symbol = symbol.upper()
+        side, key = ("above", -level) if kind in ("above", "pct_up") else ("below", level)
+        with self._lock:
+            rules = self._symbols.setdefault(symbol, _SymbolRules())
+            insort(getattr(rules, side), (key, rule_id))
+            self._rules[rule_id] = (symbol, side, key)
+
+    def remove(self, rule_id: int) -> bool:
+        """
+        Remove a rule from the index.
+
+        Args:
+            rule_id (int): The rule's ID.
+        Returns:
+            bool: True if the rule was indexed.
+        """
+        with self._lock:
+            entry = self._rules.pop(rule_id, None)
+            if entry is None:
+                return False
+            symbol, side, key = entry
+            rules = self._symbols[symbol]
+            array = getattr(rules, side)
+            del array[bisect_left(array, (key, rule_id))]
+            if not rules:
+                del self._symbols[symbol]
+            return True
+
+    def evaluate(self, symbol: str, price: float) -> list:
+        """
+        Fire and remove every rule on a symbol triggered by a price.
+
+        Args:
+            symbol (str): The symbol that traded.
+            price (float): The new price.
+        Returns:
+            list[int]: IDs of the fired rules.
+        """
+        with self._lock:
+            rules = self._symbols.get(symbol.upper())
+            if rules is None:
+                return []
+            fired = []
+            for array, cut in ((rules.above, bisect_left(rules.above, (-price,))),
+                               (rules.below, bisect_left(rules.below, (price,)))):
+                if cut < len(array):
+                    fired.extend(rule_id for _, rule_id in array[cut:])
+                    del array[cut:]
+            for rule_id in fired:
+                del self._rules[rule_id]
+            if not rules:
+                del self._symbols[symbol.upper()]
+            return fired
+
+    def symbols(self) -> set:
+        """
+        Return the symbols that have at least one active rule.
+        """
+        with self._lock:
+            return set(self._symbols)
+
+#------------------------------------------------------------------------
+class AlertScheduler:
+    """
+    Feeds price updates from the price hub into the alert engine and records fired alerts in the inbox.
+
+    The scheduler holds one hub subscription covering every symbol with an active rule, so alert evaluation
+    shares the same single upstream feed per symbol as streaming clients.
+    """
+    def __init__(self, engine: AlertEngine, hub=price_hub):
+        self.engine = engine
+        self.hub = hub
+        self._subscription = None
+        self._loop = None
+        self._task = None
+
+    async def start(self):
+        """
+        Load active rules from the database and start evaluating price updates. Must run in the event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        rules = await self._loop.run_in_executor(None, self._load_rules)
+        self.engine.load(rules)
+        self._subscription = Subscription()
+        self.hub.subscribe(self._subscription, list(self.engine.symbols()))
+        self._task = asyncio.create_task(self._run())
+
+    def watch(self, symbol: str):
+        """
+        Make sure price updates for a symbol reach the engine. Safe to call from any thread.
+
+        Args:
+            symbol (str): Symbol that gained an active rule.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.hub.subscribe, self._subscription, [symbol])
+
+    def _resubscribe(self, symbol: str):
+        if symbol in self.engine.symbols():
+            self.hub.subscribe(self._subscription, [symbol])
+
+    def _load_rules(self):
+        db = SessionLocal()
+        try:
+            return get_active_alert_rules(db)
+        finally:
+            db.close()
+
+    def _record(self, fired: list):
+        db = SessionLocal()
+        try:
+            record_fired_alerts(db, fired)
+        finally:
+            db.close()
+
+    async def _run(self):
+        while True:
+            batch = await self._subscription.get()
+            fired = []
+            for update in batch:
+                if "error" in update:
+                    # The hub detached us from the failed feed; try again later while rules still need it.
+                    self._loop.call_later(ALERT_FEED_RETRY_SECONDS, self._resubscribe, update["symbol"])
+                    continue
+                if update.get("price") is None:
+                    continue
+                fired.extend((rule_id, update["price"]) for rule_id in self.engine.evaluate(update["symbol"], update["price"]))
+            # Stop polling symbols whose last rule has fired or been removed.
+            idle = self._subscription.symbols - self.engine.symbols()
+            if idle:
+                self.hub.unsubscribe(self._subscription, list(idle))
+            if fired:
+                try:
+                    await self._loop.run_in_executor(None, self._record, fired)
+                except Exception as e:
+                    print("Recording fired alerts failed:", e)
+
+#------------------------------------------------------------------------
+alert_engine = AlertEngine()
+alert_scheduler = AlertScheduler(alert_engine)
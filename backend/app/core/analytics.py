@@ -0,0 +1,169 @@
+"""
+analytics.py
+
+This module provides vectorized multi-symbol return analytics (correlation, covariance, beta, portfolio risk).
+
+Daily closes for all symbols are aligned on one common calendar as a (days x symbols) matrix. Every statistic
+is then a handful of matrix operations over that matrix, with pairwise-complete handling of missing days,
+so a watchlist of hundreds of symbols is analyzed in a single pass.
+
+- load_bars: Fetches bars for many symbols concurrently through the bar cache.
+- align_closes: Aligns per-symbol bars into a dates x symbols close matrix (NaN where a symbol has no bar).
+- pairwise_cov_corr: Pairwise-complete covariance and correlation matrices of a returns matrix.
+- portfolio_analytics: Correlation, covariance, betas and equal-weight portfolio volatility and drawdown.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from app.core.historical_data import bar_cache, slice_bars
+#------------------------------------------------------------------------
+
+ANALYTICS_FETCH_WORKERS = int(os.getenv("ANALYTICS_FETCH_WORKERS", 8))
+TRADING_DAYS_PER_YEAR = 252
+MIN_OVERLAP = 20
+
+#------------------------------------------------------------------------
+def load_bars(symbols: list, timespan: str, from_date: str, to_date: str) -> tuple:
+    """
+    Fetch bars for several symbols concurrently through the shared bar cache.
+
+    Args:
+        symbols (list[str]): Stock ticker symbols.
+        timespan (str): The time granularity.
+        from_date (str): Start date (YYYY-MM-DD).
+        to_date (str): End date (YYYY-MM-DD).
+    Returns:
+        tuple: (dict of symbol -> bars within the range, dict of symbol -> error message for failed fetches).
+    """
+    def fetch(symbol):
+        try:
+            bars, _, _ = bar_cache.series(symbol, timespan, from_date, to_date)
+            return symbol, slice_bars(bars, from_date, to_date), None
+        except Exception as e:
+            return symbol, None, str(e)
+
+    loaded, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=ANALYTICS_FETCH_WORKERS) as pool:
+        for symbol, bars, error in pool.map(fetch, symbols):
+            if error is None:
+                loaded[symbol] = bars
+            else:
+                errors[symbol] = error
+    return loaded, errors
+
+def align_closes(bars_by_symbol: dict) -> tuple:
+    """
+    Align per-symbol bars on the union of their timestamps.
+
+    Args:
+        bars_by_symbol (dict): Symbol -> list of OHLCV bars.
+    Returns:
+        tuple: (timestamps array, list of symbols, closes matrix of shape (timestamps, symbols) with NaN gaps).
+    """
+    symbols = list(bars_by_symbol)
+    times = [np.fromiter((b["t"] for b in bars_by_symbol[s]), dtype=np.int64) for s in symbols]
+    calendar = np.unique(np.concatenate(times)) if times else np.empty(0, dtype=np.int64)
+    closes = np.full((len(calendar), len(symbols)), np.nan)
+    for j, s in enumerate(symbols):
+        rows = np.searchsorted(calendar, times[j])
+        closes[rows, j] = [b["c"] for b in bars_by_symbol[s]]
+    return calendar, symbols, closes
+
+#------------------------------------------------------------------------
+def pairwise_cov_corr(returns: np.ndarray, min_overlap: int = MIN_OVERLAP) -> tuple:
+    """
+    Pairwise-complete covariance and correlation of the columns of a returns matrix.
+
+    Each (i, j) entry uses only the rows where both columns are present, computed for all pairs at once
+    with matrix products of the zero-filled returns and the presence mask.
+
+    Args:
+        returns (np.ndarray): Returns matrix (rows x columns), NaN where missing.
+        min_overlap (int): Minimum number of shared rows; pairs with fewer are NaN.
+    Returns:
+        tuple: (covariance matrix, correlation matrix, overlap counts, pairwise variance matrix where
+                entry (i, j) is the variance of column i over the rows shared with column j).
+    """
+    present = ~np.isnan(returns)
+    mask = present.astype(float)
+    x = np.where(present, returns, 0.0)
+    n = mask.T @ mask
+    sum_x = x.T @ mask            # (i, j): sum of column i over rows where i and j are present
+    sum_xx = (x * x).T @ mask
+    sum_xy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (sum_xy - sum_x * sum_x.T / n) / (n - 1)
+        var = (sum_xx - sum_x * sum_x / n) / (n - 1)
+        corr = cov / np.sqrt(var * var.T)
+    too_short = n < max(min_overlap, 2)
+    cov[too_short] = np.nan
+    corr[too_short] = np.nan
+    var[too_short] = np.nan
+    return cov, corr, n, var
+
+def _drawdown(returns: np.ndarray) -> tuple:
+    equity = np.cumprod(1.0 + returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    return equity, drawdown
+
+def _nan_to_none(values) -> list:
+    return np.where(np.isnan(values), None, np.round(values, 6)).tolist()
+
+#------------------------------------------------------------------------
+def portfolio_analytics(bars_by_symbol: dict, benchmark: str = None, portfolio_symbols: list = None) -> dict:
+    """
+    Compute return correlation/covariance, betas and equal-weight portfolio risk for a set of symbols.
+
+    Args:
+        bars_by_symbol (dict): Symbol -> daily bars. May include the benchmark symbol.
+        benchmark (str, optional): Symbol betas are computed against.
+        portfolio_symbols (list[str], optional): Symbols that make up the portfolio. Defaults to every symbol
+            except the benchmark; pass it explicitly to keep a benchmark the user actually holds.
+    Returns:
+        dict: Symbols, observation count, covariance and correlation matrices (annualized covariance),
+              per-symbol annualized volatility and beta, and equal-weight portfolio statistics.
+    """
+    calendar, symbols, closes = align_closes(bars_by_symbol)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = closes[1:] / closes[:-1] - 1.0
+    cov, corr, _, var = pairwise_cov_corr(returns)
+
+    if portfolio_symbols is None:
+        members = [j for j, s in enumerate(symbols) if s != benchmark]
+    else:
+        wanted = set(portfolio_symbols)
+        members = [j for j, s in enumerate(symbols) if s in wanted]
+    betas = None
+    if benchmark in symbols:
+        b = symbols.index(benchmark)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = cov[:, b] / var[b, :]
+        betas = dict(zip([symbols[j] for j in members], _nan_to_none(beta[members])))
+
+    ix = np.ix_(members, members)
+    portfolio = {}
+    member_returns = returns[:, members]
+    has_any = ~np.all(np.isnan(member_returns), axis=1) if len(members) else np.zeros(len(returns), dtype=bool)
+    if has_any.any():
+        # Equal weight across the symbols that traded that day, rebalanced daily.
+        daily = np.nanmean(member_returns[has_any], axis=1)
+        equity, drawdown = _drawdown(daily)
+        portfolio = {
+            "observations": int(len(daily)),
+            "total_return": round(float(equity[-1] - 1.0), 6),
+            "annualized_volatility": round(float(daily.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)), 6) if len(daily) > 1 else None,
+            "max_drawdown": round(float(drawdown.min()), 6),
+            "current_drawdown": round(float(drawdown[-1]), 6),
+        }
+
+    member_symbols = [symbols[j] for j in members]
+    return {
+        "symbols": member_symbols,
+        "benchmark": benchmark if benchmark in symbols else None,
+        "observations": int(len(returns)),
+        "correlation": _nan_to_none(corr[ix]),
+        "covariance": _nan_to_none(cov[ix] * TRADING_DAYS_PER_YEAR),
+        "volatility": dict(zip(member_symbols, _nan_to_none(np.sqrt(np.diag(cov)[members] * TRADING_DAYS_PER_YEAR)))),
+        "beta": betas,
+        "portfolio": portfolio,
+    }
@@ -0,0 +1,231 @@
+"""
+backtest.py
+
+This module provides a vectorized backtesting engine over historical bars.
+
+Signals, positions, returns and the equity curve are computed as whole-array NumPy operations (no per-bar
+Python loop), so a single run over years of minute bars takes milliseconds. Parameter sweeps fan a grid of
+strategy specs out over one shared, lazily started process pool, with a bounded number of sweeps at a time.
+
+Strategy specs are dicts:
+- {"type": "sma_crossover" | "ema_crossover", "fast": 10, "slow": 50}: long while the fast average is above the slow one.
+- {"type": "threshold", "indicator": "rsi_14", "lower": 30, "upper": 70}: enter long when the indicator drops below
+  `lower`, exit when it rises above `upper`.
+Both accept "allow_short" (short instead of flat) and "fee_bps" (cost per unit of position change).
+
+- run_backtest: Runs one strategy and returns the equity curve, trades and summary statistics.
+- run_sweep: Runs a list of strategy specs in parallel and returns their summary statistics.
+- shutdown_sweep_pool: Stops the shared sweep worker pool.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+import numpy as np
+from app.core.indicators import EMA, SMA, parse_indicator
+#------------------------------------------------------------------------
+
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", os.cpu_count() or 2))
+BACKTEST_MAX_SWEEPS = int(os.getenv("BACKTEST_MAX_SWEEPS", 2))
+BACKTEST_SWEEP_WAIT_SECONDS = float(os.getenv("BACKTEST_SWEEP_WAIT_SECONDS", 30))
+PERIODS_PER_YEAR = {
+    "minute": 252 * 390, "hour": 252 * 7, "day": 252, "week": 52, "month": 12, "quarter": 4, "year": 1,
+}
+
+#------------------------------------------------------------------------
+def _ffill(values: np.ndarray) -> np.ndarray:
+    # Forward-fill NaNs (leading NaNs become 0) without a Python loop.
+    idx = np.where(np.isnan(values), 0, np.arange(len(values)))
+    np.maximum.accumulate(idx, out=idx)
+    filled = values[idx]
+    return np.nan_to_num(filled, nan=0.0)
+
+def strategy_signal(closes: np.ndarray, spec: dict) -> np.ndarray:
+    """
+    Compute the target position (1 long, 0 flat, -1 short) at the close of every bar.
+
+    Args:
+        closes (np.ndarray): Close prices.
+        spec (dict): Strategy spec.
+    Returns:
+        np.ndarray: Target position per bar.
+    Raises:
+        ValueError: If the spec is invalid.
+    """
+    kind = spec.get("type")
+    short = -1.0 if spec.get("allow_short") else 0.0
+    if kind in ("sma_crossover", "ema_crossover"):
+        fast, slow = int(spec.get("fast", 10)), int(spec.get("slow", 50))
+        if not 1 <= fast < slow:
+            raise ValueError("Crossover strategies need 1 <= fast < slow")
+        average = SMA if kind == "sma_crossover" else EMA
+        fast_values = next(iter(average(fast).compute(closes)[0].values()))
+        slow_values = next(iter(average(slow).compute(closes)[0].values()))
+        signal = np.where(fast_values > slow_values, 1.0, short)
+        return np.where(np.isnan(slow_values), 0.0, signal)
+    if kind == "threshold":
+        lower, upper = float(spec.get("lower", 30)), float(spec.get("upper", 70))
+        if lower >= upper:
+            raise ValueError("Threshold strategies need lower < upper")
+        indicator = parse_indicator(spec.get("indicator", "rsi_14"))
+        values = next(iter(indicator.compute(closes)[0].values()))
+        # Entries and exits mark state changes; the position holds in between.
+        events = np.where(values < lower, 1.0, np.where(values > upper, short, np.nan))
+        return _ffill(events)
+    raise ValueError(f"Unknown strategy type: {kind}")
+
+#------------------------------------------------------------------------
+def _simulate(closes: np.ndarray, spec: dict):
+    signal = strategy_signal(closes, spec)
+    position = np.concatenate(([0.0], signal[:-1]))  # act on the next bar after the signal
+    bar_returns = np.concatenate(([0.0], closes[1:] / closes[:-1] - 1.0))
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    strategy_returns = position * bar_returns - turnover * float(spec.get("fee_bps", 0.0)) / 10_000
+    equity = np.cumprod(1.0 + strategy_returns)
+    return position, strategy_returns, equity
+
+def _stats(position: np.ndarray, strategy_returns: np.ndarray, equity: np.ndarray, periods_per_year: int) -> dict:
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    std = strategy_returns[1:].std(ddof=1) if len(strategy_returns) > 2 else 0.0
+    years = len(strategy_returns) / periods_per_year
+    changes = np.flatnonzero(np.diff(position, prepend=0.0))
+    entries = changes[position[changes] != 0]
+    return {
+        "total_return": round(float(equity[-1] - 1.0), 6),
+        "annualized_return": round(float(equity[-1] ** (1.0 / years) - 1.0), 6) if years > 0 and equity[-1] > 0 else None,
+        "sharpe": round(float(strategy_returns[1:].mean() / std * np.sqrt(periods_per_year)), 4) if std > 0 else None,
+        "max_drawdown": round(float(drawdown.min()), 6),
+        "exposure": round(float(np.mean(position != 0)), 4),
+        "trades": int(len(entries)),
+    }
+
+def _trades(times: np.ndarray, closes: np.ndarray, position: np.ndarray) -> list:
+    # A trade is a run of constant non-zero position; boundaries come from one vectorized diff.
+    changes = np.flatnonzero(np.diff(position, prepend=0.0, append=0.0))
+    trades = []
+    for start, end in zip(changes[:-1], changes[1:]):
+        side = position[start]
+        if side == 0:
+            continue
+        # Position in bar `start` was set at the close of bar start-1, so that close is the entry price.
+        entry_i, exit_i = start - 1, end - 1
+        entry, exit_ = closes[entry_i], closes[exit_i]
+        trades.append({
+            "side": "long" if side > 0 else "short",
+            "entry_t": int(times[entry_i]), "entry_price": float(entry),
+            "exit_t": int(times[exit_i]), "exit_price": float(exit_),
+            "return": round(float(side * (exit_ / entry - 1.0)), 6),
+            "open": bool(end == len(position)),
+        })
+    return trades
+
+#------------------------------------------------------------------------
+def run_backtest(times: np.ndarray, closes: np.ndarray, spec: dict, timespan: str = "day") -> dict:
+    """
+    Run one strategy over a close series.
+
+    Args:
+        times (np.ndarray): Bar timestamps (milliseconds).
+        closes (np.ndarray): Close prices.
+        spec (dict): Strategy spec.
+        timespan (str): Bar granularity, used to annualize statistics.
+    Returns:
+        dict: Summary statistics, trades, and the equity curve as parallel 't' / 'equity' lists.
+    Raises:
+        ValueError: If the spec is invalid or there are fewer than two bars.
+    """
+    if len(closes) < 2:
+        raise ValueError("Need at least two bars to backtest")
+    position, strategy_returns, equity = _simulate(closes, spec)
+    stats = _stats(position, strategy_returns, equity, PERIODS_PER_YEAR.get(timespan, 252))
+    trades = _trades(times, closes, position)
+    closed = [t for t in trades if not t["open"]]
+    stats["win_rate"] = round(sum(t["return"] > 0 for t in closed) / len(closed), 4) if closed else None
+    return {
+        "stats": stats,
+        "trades": trades,
+        "t": times.tolist(),
+        "equity": np.round(equity, 6).tolist(),
+    }
+
+#------------------------------------------------------------------------
+class SweepBusyError(RuntimeError):
+    """
+    Raised when the maximum number of concurrent sweeps is already running.
+    """
+
+_pool = None
+_pool_lock = threading.Lock()
+_sweep_slots = threading.BoundedSemaphore(BACKTEST_MAX_SWEEPS)
+
+def _get_pool() -> ProcessPoolExecutor:
+    # One pool for the whole process, created on first use, so workers import NumPy and the app modules once.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned (not forked) workers, since the server process runs background threads.
+            _pool = ProcessPoolExecutor(max_workers=BACKTEST_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+def shutdown_sweep_pool():
+    """
+    Shut down the shared sweep worker pool, if it was started. Called when the application stops.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _run_specs(closes: np.ndarray, specs: list, periods_per_year: int) -> list:
+    results = []
+    for spec in specs:
+        try:
+            position, strategy_returns, equity = _simulate(closes, spec)
+            results.append({"params": spec, "stats": _stats(position, strategy_returns, equity, periods_per_year)})
+        except ValueError as e:
+            results.append({"params": spec, "error": str(e)})
+    return results
+
+def run_sweep(closes: np.ndarray, specs: list, timespan: str = "day", workers: int = BACKTEST_WORKERS) -> list:
+    """
+    Run many strategy specs over the same close series on the shared process pool.
+
+    Specs are split into a few chunks per worker; the close series is shipped once per chunk. At most
+    BACKTEST_MAX_SWEEPS sweeps run at once, so concurrent requests queue for the same workers instead of
+    starting more processes.
+
+    Args:
+        closes (np.ndarray): Close prices.
+        specs (list[dict]): Strategy specs, e.g. one per point of a parameter grid.
+        timespan (str): Bar granularity, used to annualize statistics.
+        workers (int): Number of chunks to spread the specs over (1 runs in the calling thread).
+    Returns:
+        list[dict]: One result per spec with 'params' and either 'stats' or 'error', in input order.
+    Raises:
+        ValueError: If there are fewer than two bars.
+        SweepBusyError: If no sweep slot frees up within BACKTEST_SWEEP_WAIT_SECONDS.
+    """
+    global _pool
+    if len(closes) < 2:
+        raise ValueError("Need at least two bars to backtest")
+    periods = PERIODS_PER_YEAR.get(timespan, 252)
+    workers = max(1, min(workers, len(specs)))
+    if workers == 1:
+        return _run_specs(closes, specs, periods)
+    if not _sweep_slots.acquire(timeout=BACKTEST_SWEEP_WAIT_SECONDS):
+        raise SweepBusyError("Too many backtest sweeps are running, try again shortly")
+    try:
+        size = max(1, -(-len(specs) // (workers * 4)))
+        pool = _get_pool()
+        futures = [pool.submit(_run_specs, closes, specs[i:i + size], periods) for i in range(0, len(specs), size)]
+        return [result for future in futures for result in future.result()]
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next sweep starts a fresh one.
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        raise
+    finally:
+        _sweep_slots.release()
@@ -0,0 +1,267 @@
+"""
+charts.py
+
+This module renders compact SVG sparkline and candlestick charts from our own historical bars.
+
+Bars come from the shared bar cache and are bucketed down to the chart's pixel width with NumPy before being
+drawn, so a chart is a few kilobytes no matter how many bars the period covers. Rendered charts are kept in a
+content-addressed cache: the chart inputs map to the digest of the rendered markup, and each digest is stored once,
+so repeated requests (and identical charts for different inputs) never re-render and are served with a stable ETag.
+
+- CHART_PERIODS / CHART_INTERVALS: Supported Yahoo-style `period` and `interval` values.
+- chart_range: Converts a period to a (from_date, to_date) range.
+- render_chart: Renders the SVG body (paths only) for a list of bars.
+- ChartCache: Bounded LRU cache of rendered chart bodies, addressed by content digest.
+- get_chart: Standalone SVG chart for one symbol.
+- get_chart_sprite: One SVG sprite with a <symbol> per chart for many symbols.
+"""
+import hashlib
+import html
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+from app.core.analytics import load_bars
+#------------------------------------------------------------------------
+
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", 2048))
+CHART_PERIODS = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "ytd": None, "1y": 366, "2y": 731, "5y": 1827}
+CHART_INTERVALS = {"1m": "minute", "1h": "hour", "1d": "day", "1wk": "week", "1mo": "month"}
+# Intraday bars over long periods would mean hundreds of thousands of bars for a thumbnail.
+_MAX_PERIOD_DAYS = {"minute": 5, "hour": 366}
+# Sessions (including pre- and after-hours) are trading days in New York, not UTC dates.
+_MARKET_TZ = ZoneInfo("America/New_York")
+_UP_COLOR = "#16a34a"
+_DOWN_COLOR = "#dc2626"
+
+#------------------------------------------------------------------------
+def chart_range(period: str, interval: str) -> tuple:
+    """
+    Convert a chart period to a date range ending today.
+
+    Args:
+        period (str): One of CHART_PERIODS.
+        interval (str): One of CHART_INTERVALS.
+    Returns:
+        tuple: (Polygon timespan, from_date, to_date).
+    Raises:
+        ValueError: If the period or interval is unknown, or the combination would return too many bars.
+    """
+    if period not in CHART_PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    if interval not in CHART_INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}")
+    today = date.today()
+    start = date(today.year, 1, 1) if period == "ytd" else today - timedelta(days=CHART_PERIODS[period])
+    timespan = CHART_INTERVALS[interval]
+    limit = _MAX_PERIOD_DAYS.get(timespan)
+    if limit is not None and (today - start).days > limit:
+        raise ValueError(f"Interval {interval} is not supported for period {period}")
+    if period == "1d":
+        # Reach back over weekends and holidays; the last session is selected once bars are loaded.
+        start = today - timedelta(days=5)
+    return timespan, start.isoformat(), today.isoformat()
+
+def _last_session(bars: list) -> list:
+    day = lambda b: datetime.fromtimestamp(b["t"] / 1000, tz=_MARKET_TZ).date()
+    last = day(bars[-1])
+    return [b for b in bars if day(b) == last]
+
+#------------------------------------------------------------------------
+def _bucket_edges(n: int, buckets: int) -> np.ndarray:
+    # Start index of every bucket when n bars are split into at most `buckets` contiguous groups.
+    if n <= buckets:
+        return np.arange(n)
+    return np.unique(np.arange(buckets) * n // buckets)
+
+def _fmt(values: np.ndarray) -> list:
+    return [f"{v:.1f}".rstrip("0").rstrip(".") for v in values]
+
+def render_chart(bars: list, style: str = "line", width: int = 120, height: int = 32) -> str:
+    """
+    Render the inner markup of a chart (no <svg> wrapper), drawn in a `width` x `height` coordinate box.
+
+    Args:
+        bars (list): OHLCV bars sorted by time.
+        style (str): 'line' for a sparkline of closes, 'candle' for candlesticks.
+        width (int): Chart width in pixels.
+        height (int): Chart height in pixels.
+    Returns:
+        str: SVG path elements, colored green if the period closed up and red otherwise.
+    Raises:
+        ValueError: If the style is unknown.
+    """
+    if style not in ("line", "candle"):
+        raise ValueError(f"Unknown chart style: {style}")
+    if not bars:
+        return ""
+    closes = np.fromiter((b["c"] for b in bars), dtype=float, count=len(bars))
+    color = _UP_COLOR if closes[-1] >= bars[0].get("o", closes[0]) else _DOWN_COLOR
+    pad = 1.0
+
+    if style == "line":
+        edges = _bucket_edges(len(closes), width)
+        ends = np.append(edges[1:], len(closes)) - 1
+        points = closes[ends]
+        low, high = points.min(), points.max()
+        span = (high - low) or 1.0
+        xs = np.linspace(pad, width - pad, len(points)) if len(points) > 1 else np.array([width / 2])
+        ys = pad + (high - points) / span * (height - 2 * pad)
+        coords = " ".join(f"{x},{y}" for x, y in zip(_fmt(xs), _fmt(ys)))
+        return (f'<polyline points="{coords}" fill="none" stroke="{color}" stroke-width="1.5" '
+                f'stroke-linejoin="round" stroke-linecap="round"/>')
+
+    # One candle per 3 pixels at most; each candle aggregates the bars of its bucket.
+    opens = np.fromiter((b.get("o", b["c"]) for b in bars), dtype=float, count=len(bars))
+    highs = np.fromiter((b.get("h", b["c"]) for b in bars), dtype=float, count=len(bars))
+    lows = np.fromiter((b.get("l", b["c"]) for b in bars), dtype=float, count=len(bars))
+    edges = _bucket_edges(len(bars), max(1, width // 3))
+    ends = np.append(edges[1:], len(bars)) - 1
+    o, c = opens[edges], closes[ends]
+    h, l = np.maximum.reduceat(highs, edges), np.minimum.reduceat(lows, edges)
+    low, high = l.min(), h.max()
+    scale = (height - 2 * pad) / ((high - low) or 1.0)
+    y = lambda v: pad + (high - v) * scale
+    step = (width - 2 * pad) / len(o)
+    xs = pad + step * (np.arange(len(o)) + 0.5)
+    body = max(step * 0.6, 0.5)
+    body_w = _fmt([body])[0]
+    top, bottom = y(np.maximum(o, c)), y(np.minimum(o, c))
+    tall = np.maximum(bottom - top, 0.5)
+    parts = []
+    for rising, fill in ((c >= o, _UP_COLOR), (c < o, _DOWN_COLOR)):
+        if not rising.any():
+            continue
+        wicks = "".join(f"M{x} {a}V{b}" for x, a, b in zip(_fmt(xs[rising]), _fmt(y(h[rising])), _fmt(y(l[rising]))))
+        bodies = "".join(f"M{x} {t}h{body_w}v{v}h-{body_w}z"
+                         for x, t, v in zip(_fmt(xs[rising] - body / 2), _fmt(top[rising]), _fmt(tall[rising])))
+        parts.append(f'<path d="{wicks}" stroke="{fill}" stroke-width="1"/><path d="{bodies}" fill="{fill}"/>')
+    return "".join(parts)
+
+#------------------------------------------------------------------------
+class ChartCache:
+    """
+    LRU cache of rendered chart bodies, addressed by the digest of their content.
+
+    Render keys (the chart inputs) point at digests; each distinct body is stored once and dropped when
+    no remaining key refers to it.
+
+    Attributes:
+        max_entries (int): Maximum number of render keys kept.
+    """
+    def __init__(self, max_entries: int = CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._keys = OrderedDict()  # render key -> digest
+        self._bodies = {}  # digest -> [body, number of keys referring to it]
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: tuple, render) -> tuple:
+        """
+        Return the cached chart for a render key, rendering and storing it on a miss.
+
+        Args:
+            key (tuple): Hashable description of every chart input.
+            render (Callable[[], str]): Produces the chart body.
+        Returns:
+            tuple: (digest, body).
+        """
+        with self._lock:
+            digest = self._keys.get(key)
+            if digest is not None:
+                self._keys.move_to_end(key)
+                return digest, self._bodies[digest][0]
+        body = render()
+        digest = hashlib.blake2b(body.encode(), digest_size=12).hexdigest()
+        with self._lock:
+            if key not in self._keys:
+                self._keys[key] = digest
+                self._bodies.setdefault(digest, [body, 0])[1] += 1
+                while len(self._keys) > self.max_entries:
+                    _, old = self._keys.popitem(last=False)
+                    entry = self._bodies[old]
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        del self._bodies[old]
+        return digest, body
+
+    def __len__(self):
+        return len(self._bodies)
+
+#------------------------------------------------------------------------
+def _rendered(symbols: list, period: str, interval: str, style: str, width: int, height: int) -> tuple:
+    timespan, from_date, to_date = chart_range(period, interval)
+    loaded, errors = load_bars(symbols, timespan, from_date, to_date)
+    charts = {}
+    for symbol in symbols:
+        bars = loaded.get(symbol)
+        if not bars:
+            continue
+        if period == "1d":
+            bars = _last_session(bars)
+        # Bars are append-only per series apart from a revised last bar, so the count and every field of
+        # the end bars identify the rendered data.
+        key = (symbol, period, interval, style, width, height, len(bars),
+               tuple(sorted(bars[0].items())), tuple(sorted(bars[-1].items())))
+        charts[symbol] = chart_cache.get_or_render(key, lambda bars=bars: render_chart(bars, style, width, height))
+    return charts, errors
+
+def _svg(body: str, width: int, height: int) -> str:
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">{body}</svg>')
+
+def get_chart(symbol: str, period: str = "1mo", interval: str = "1d", style: str = "line",
+              width: int = 120, height: int = 32) -> tuple:
+    """
+    Render (or fetch from cache) a standalone SVG chart for one symbol.
+
+    Args:
+        symbol (str): The stock ticker symbol.
+        period (str): One of CHART_PERIODS.
+        interval (str): One of CHART_INTERVALS.
+        style (str): 'line' or 'candle'.
+        width (int): Width in pixels.
+        height (int): Height in pixels.
+    Returns:
+        tuple: (content digest, SVG document).
+    Raises:
+        ValueError: If an argument is invalid.
+        LookupError: If the bars could not be fetched or none exist for the period.
+    """
+    symbol = symbol.upper()
+    charts, errors = _rendered([symbol], period, interval, style, width, height)
+    if symbol not in charts:
+        raise LookupError(errors.get(symbol) or f"No bars for {symbol} over {period}")
+    digest, body = charts[symbol]
+    return digest, _svg(body, width, height)
+
+def get_chart_sprite(symbols: list, period: str = "1mo", interval: str = "1d", style: str = "line",
+                     width: int = 120, height: int = 32) -> tuple:
+    """
+    Render an SVG sprite holding one chart per symbol as <symbol id="chart-{SYMBOL}">, for use with <use href>.
+
+    Args:
+        symbols (list[str]): Stock ticker symbols.
+        period (str): One of CHART_PERIODS.
+        interval (str): One of CHART_INTERVALS.
+        style (str): 'line' or 'candle'.
+        width (int): Width of each chart in pixels.
+        height (int): Height of each chart in pixels.
+    Returns:
+        tuple: (content digest, SVG sprite document, list of symbols without a chart).
+    Raises:
+        ValueError: If an argument is invalid.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    charts, _ = _rendered(symbols, period, interval, style, width, height)
+    members = "".join(f'<symbol id="chart-{html.escape(s)}" viewBox="0 0 {width} {height}">{charts[s][1]}</symbol>'
+                      for s in symbols if s in charts)
+    # The sprite is addressed by the digests of its members, so it is never hashed as a whole.
+    digest = hashlib.blake2b("|".join(f"{s}:{charts[s][0]}" for s in symbols if s in charts).encode(),
+                             digest_size=12).hexdigest()
+    sprite = f'<svg xmlns="http://www.w3.org/2000/svg" style="display:none">{members}</svg>'
+    return digest, sprite, [s for s in symbols if s not in charts]
+
+#------------------------------------------------------------------------
+chart_cache = ChartCache()
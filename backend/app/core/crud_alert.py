@@ -0,0 +1,190 @@
+"""
+crud_alert.py
+
+This module provides CRUD operations for price alert rules and the alert inbox in the FastAPI application.
+
+- alert_level: Compute the absolute trigger price of a rule.
+- create_alert_rule: Attach a new alert rule to a watchlist entry.
+- get_alert_rules: Retrieve a user's alert rules.
+- get_active_alert_rules: Retrieve every active alert rule (used to load the alert engine).
+- delete_alert_rule: Delete one of a user's alert rules.
+- delete_alert_rules_for_watchlist: Delete all rules attached to a watchlist entry.
+- record_fired_alerts: Deactivate fired rules and add their events to the owners' inboxes.
+- get_alert_events: Retrieve a page of a user's alert inbox.
+- mark_alert_event_read: Mark one of a user's alerts as read.
+"""
+from sqlalchemy.orm import Session
+from app.models.alert import AlertEvent, AlertRule
+from app.models.watchlist import Watchlist
+#------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------
+def alert_level(kind: str, threshold: float, reference_price: float = None) -> float:
+    """
+    Compute the absolute price that triggers a rule.
+    Args:
+        kind (str): 'above', 'below', 'pct_up' or 'pct_down'.
+        threshold (float): Price level, or percent move for pct_* kinds.
+        reference_price (float, optional): Price percent moves are measured from.
+    Returns:
+        float: Trigger price.
+    Raises:
+        ValueError: If a percent rule has no reference price or the kind is unknown.
+    """
+    if kind in ("above", "below"):
+        return threshold
+    if reference_price is None:
+        raise ValueError("Percent-move rules need a reference price")
+    if kind == "pct_up":
+        return reference_price * (1 + threshold / 100)
+    if kind == "pct_down":
+        return reference_price * (1 - threshold / 100)
+    raise ValueError(f"Unknown alert kind: {kind}")
+
+#------------------------------------------------------------------------
+def create_alert_rule(db: Session, watch: Watchlist, kind: str, threshold: float, reference_price: float = None):
+    """
+    Attach a new alert rule to a watchlist entry.
+    Args:
+        db (Session): SQLAlchemy session.
+        watch (Watchlist): The watchlist entry (defines user and symbol).
+        kind (str): Rule kind.
+        threshold (float): Price level or percent move.
+        reference_price (float, optional): Price percent moves are measured from.
+    Returns:
+        AlertRule: The created rule.
+    """
+    rule = AlertRule(
+        user_id=watch.user_id,
+        watchlist_id=watch.id,
+        stock_symbol=watch.stock_symbol.upper(),
+        kind=kind,
+        threshold=threshold,
+        reference_price=reference_price,
+        level=alert_level(kind, threshold, reference_price),
+    )
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+#------------------------------------------------------------------------
+def get_alert_rules(db: Session, user_id: int, active_only: bool = False):
+    """
+    Retrieve a user's alert rules.
+    Args:
+        db (Session): SQLAlchemy session.
+        user_id (int): The user's ID.
+        active_only (bool): Only return rules that have not fired.
+    Returns:
+        list[AlertRule]: The user's rules, newest first.
+    """
+    query = db.query(AlertRule).filter(AlertRule.user_id == user_id)
+    if active_only:
+        query = query.filter(AlertRule.active.is_(True))
+    return query.order_by(AlertRule.id.desc()).all()
+
+#------------------------------------------------------------------------
+def get_active_alert_rules(db: Session):
+    """
+    Retrieve every active alert rule across all users.
+    Args:
+        db (Session): SQLAlchemy session.
+    Returns:
+        list[AlertRule]: All active rules.
+    """
+    return db.query(AlertRule).filter(AlertRule.active.is_(True)).all()
+
+#------------------------------------------------------------------------
+def delete_alert_rule(db: Session, user_id: int, rule_id: int):
+    """
+    Delete one of a user's alert rules.
+    Args:
+        db (Session): SQLAlchemy session.
+        user_id (int): The user's ID.
+        rule_id (int): The rule's ID.
+    Returns:
+        AlertRule | None: The deleted rule, or None if not found.
+    """
+    rule = db.query(AlertRule).filter(AlertRule.id == rule_id, AlertRule.user_id == user_id).first()
+    if rule:
+        db.delete(rule)
+        db.commit()
+    return rule
+
+#------------------------------------------------------------------------
+def delete_alert_rules_for_watchlist(db: Session, watchlist_id: int):
+    """
+    Delete all alert rules attached to a watchlist entry (without committing).
+    Args:
+        db (Session): SQLAlchemy session.
+        watchlist_id (int): The watchlist entry's ID.
+    Returns:
+        list[int]: IDs of the deleted rules.
+    """
+    rules = db.query(AlertRule).filter(AlertRule.watchlist_id == watchlist_id).all()
+    for rule in rules:
+        db.delete(rule)
+    return [rule.id for rule in rules]
+
+#------------------------------------------------------------------------
+def record_fired_alerts(db: Session, fired: list):
+    """
+    Deactivate fired rules and add one inbox event per rule.
+    Args:
+        db (Session): SQLAlchemy session.
+        fired (list[tuple[int, float]]): (rule ID, triggering price) pairs.
+    Returns:
+        list[AlertEvent]: The created events.
+    """
+    prices = dict(fired)
+    rules = db.query(AlertRule).filter(AlertRule.id.in_(list(prices)), AlertRule.active.is_(True)).all()
+    events = []
+    for rule in rules:
+        rule.active = False
+        events.append(AlertEvent(
+            rule_id=rule.id, user_id=rule.user_id, stock_symbol=rule.stock_symbol,
+            kind=rule.kind, level=rule.level, price=prices[rule.id],
+        ))
+    db.add_all(events)
+    db.commit()
+    return events
+
+#------------------------------------------------------------------------
+def get_alert_events(db: Session, user_id: int, unread_only: bool = False, limit: int = 50, before_id: int = None):
+    """
+    Retrieve a page of a user's alert inbox, newest first.
+    Args:
+        db (Session): SQLAlchemy session.
+        user_id (int): The user's ID.
+        unread_only (bool): Only return unread alerts.
+        limit (int): Maximum number of alerts.
+        before_id (int, optional): Only return alerts with a smaller ID (paging cursor).
+    Returns:
+        list[AlertEvent]: Alerts, newest first.
+    """
+    query = db.query(AlertEvent).filter(AlertEvent.user_id == user_id)
+    if unread_only:
+        query = query.filter(AlertEvent.read.is_(False))
+    if before_id is not None:
+        query = query.filter(AlertEvent.id < before_id)
+    return query.order_by(AlertEvent.id.desc()).limit(limit).all()
+
+#------------------------------------------------------------------------
+def mark_alert_event_read(db: Session, user_id: int, event_id: int):
+    """
+    Mark one of a user's alerts as read.
+    Args:
+        db (Session): SQLAlchemy session.
+        user_id (int): The user's ID.
+        event_id (int): The alert event's ID.
+    Returns:
+        AlertEvent | None: The updated event, or None if not found.
+    """
+    event = db.query(AlertEvent).filter(AlertEvent.id == event_id, AlertEvent.user_id == user_id).first()
+    if event:
+        event.read = True
+        db.commit()
+        db.refresh(event)
+    return event
@@ -6,10 +6,14 @@ This module provides CRUD operations for managing user watchlists in the FastAPI
 - get_watchlist: Retrieve all watchlist entries for a user.
 - add_to_watchlist: Add a stock symbol to a user's watchlist.
 - remove_from_watchlist: Remove a stock symbol from a user's watchlist.
+- get_watched_symbols: Retrieve the distinct stock symbols across all users' watchlists.
+- get_watchlist_version: Compute a cheap version tag of a user's watchlist for HTTP cache validation.
 """
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.watchlist import Watchlist
 from app.schemas.watchlist import WatchlistCreate
+from app.core.crud_alert import delete_alert_rules_for_watchlist
 #------------------------------------------------------------------------
 
 
@@ -52,13 +56,45 @@ def remove_from_watchlist(db: Session, user_id: int, stock_symbol: str):
         user_id (int): The user's ID.
         stock_symbol (str): The stock symbol to remove.
     Returns:
-        Watchlist | None: The removed Watchlist entry, or None if not found.
+        tuple: (the removed Watchlist entry or None if not found, list of IDs of the alert rules deleted with it).
     """
     watch = db.query(Watchlist).filter(
         Watchlist.user_id == user_id,
         Watchlist.stock_symbol == stock_symbol
     ).first()
-    if watch:
-        db.delete(watch)
-        db.commit()
-    return watch 
\ No newline at end of file
+    if not watch:
+        return None, []
+    deleted_rule_ids = delete_alert_rules_for_watchlist(db, watch.id)
+    db.flush()
+    db.delete(watch)
+    db.commit()
+    return watch, deleted_rule_ids
+
+#------------------------------------------------------------------------
+def get_watched_symbols(db: Session):
+    """
+    Retrieve the distinct stock symbols on any user's watchlist.
+    Args:
+        db (Session): SQLAlchemy session.
+    Returns:
+        list[str]: Distinct, upper-cased stock symbols.
+    """
+    rows = db.query(Watchlist.stock_symbol).distinct().all()
+    return sorted({symbol.upper() for (symbol,) in rows})
+
+
+#------------------------------------------------------------------------
+def get_watchlist_version(db: Session, user_id: int):
+    """
+    Compute a version tag of a user's watchlist from one aggregate query, without loading the rows.
+    Adding an entry raises the max id and removing one changes the count and id sum, so any change yields a new tag.
+    Args:
+        db (Session): SQLAlchemy session.
+        user_id (int): The user's ID.
+    Returns:
+        str: Version tag, e.g. '3-17-42'.
+    """
+    count, max_id, id_sum = db.query(
+        func.count(Watchlist.id), func.max(Watchlist.id), func.sum(Watchlist.id)
+    ).filter(Watchlist.user_id == user_id).one()
+    return f"{count}-{max_id or 0}-{id_sum or 0}"
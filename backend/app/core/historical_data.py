@@ -1,19 +1,35 @@
 """
 historical_data.py
 
-This module provides a utility function to fetch historical price data for a given stock symbol from Polygon.io.
+This module provides utilities to fetch historical price data for a given stock symbol from Polygon.io.
 
 Functions:
 - get_historical_prices: Fetches historical OHLCV price data for a stock symbol and date range.
+- iter_historical_pages: Yields every page of historical bars for a range, following Polygon's pagination.
+- get_all_historical_prices: Fetches every bar of a range, across all pages.
+- slice_bars: Returns the bars of a sorted series that fall within a date range.
+- date_to_ms: Converts a YYYY-MM-DD date to a UTC timestamp in milliseconds, matching Polygon's bar 't' field.
+
+Classes:
+- BarCache: Bounded per (symbol, timespan) bar cache that only re-fetches from the last cached bar onward.
 """
 
+import itertools
 import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, timezone
 import requests
 from dotenv import load_dotenv
 
 #------------------------------------------------------------------------
 load_dotenv()
 POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
+BAR_CACHE_SECONDS = int(os.getenv("BAR_CACHE_SECONDS", 60))
+BAR_CACHE_MAX_SERIES = int(os.getenv("BAR_CACHE_MAX_SERIES", 512))
+BAR_CACHE_MAX_BARS = int(os.getenv("BAR_CACHE_MAX_BARS", 5_000_000))
 
 #------------------------------------------------------------------------
 def get_historical_prices(symbol: str, timespan: str = "day", from_date: str = "2024-01-01", to_date: str = "2025-07-10"):
@@ -39,3 +55,188 @@ def get_historical_prices(symbol: str, timespan: str = "day", from_date: str = "
         raise Exception(f"Polygon API error: {resp.status_code} {resp.text}")
     data = resp.json()
     return data.get("results", [])
+
+#------------------------------------------------------------------------
+def iter_historical_pages(symbol: str, timespan: str = "day", from_date: str = "2024-01-01", to_date: str = "2025-07-10"):
+    """
+    Yield historical price data page by page, following Polygon.io's `next_url` until the range is exhausted.
+    Only one page (at most 50,000 bars) is held in memory at a time.
+
+    Args:
+        symbol (str): The stock ticker symbol (e.g., 'AAPL').
+        timespan (str): The time granularity (minute, hour, day, week, month, quarter, year).
+        from_date (str): Start date in YYYY-MM-DD format.
+        to_date (str): End date in YYYY-MM-DD format.
+    Yields:
+        list: OHLCV price data points of one page.
+    Raises:
+        Exception: If an API request fails.
+    """
+    url = (
+        f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/{timespan}/{from_date}/{to_date}"
+        f"?adjusted=true&sort=asc&limit=50000&apiKey={POLYGON_API_KEY}"
+    )
+    while url:
+        resp = requests.get(url)
+        if resp.status_code != 200:
+            raise Exception(f"Polygon API error: {resp.status_code} {resp.text}")
+        data = resp.json()
+        if data.get("results"):
+            yield data["results"]
+        next_url = data.get("next_url")
+        url = f"{next_url}&apiKey={POLYGON_API_KEY}" if next_url else None
+
+#------------------------------------------------------------------------
+def get_all_historical_prices(symbol: str, timespan: str = "day", from_date: str = "2024-01-01", to_date: str = "2025-07-10"):
+    """
+    Fetch every bar of a range, following Polygon.io's pagination (get_historical_prices stops at 5,000 bars).
+
+    Args:
+        symbol (str): The stock ticker symbol (e.g., 'AAPL').
+        timespan (str): The time granularity.
+        from_date (str): Start date in YYYY-MM-DD format.
+        to_date (str): End date in YYYY-MM-DD format.
+    Returns:
+        list: All OHLCV price data points of the range.
+    Raises:
+        Exception: If an API request fails.
+    """
+    return [bar for page in iter_historical_pages(symbol, timespan, from_date, to_date) for bar in page]
+
+#------------------------------------------------------------------------
+def date_to_ms(day: str, end_of_day: bool = False) -> int:
+    """
+    Convert a YYYY-MM-DD date to UTC milliseconds since epoch (start of day, or last millisecond if end_of_day).
+    """
+    start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(start.timestamp() * 1000) + (86_400_000 - 1 if end_of_day else 0)
+
+def slice_bars(bars: list, from_date: str, to_date: str) -> list:
+    """
+    Return the bars of a time-sorted series that fall within a date range.
+
+    Args:
+        bars (list): OHLCV bars sorted by their 't' timestamp (milliseconds).
+        from_date (str): Start date in YYYY-MM-DD format (inclusive).
+        to_date (str): End date in YYYY-MM-DD format (inclusive).
+    Returns:
+        list: The bars within the range.
+    """
+    times = [b["t"] for b in bars]
+    return bars[bisect_left(times, date_to_ms(from_date)):bisect_right(times, date_to_ms(to_date, end_of_day=True))]
+
+#------------------------------------------------------------------------
+# Generations are unique across all series, so a replaced series never reuses a generation number.
+_generations = itertools.count(1)
+
+class _CachedSeries:
+    def __init__(self, from_date: str):
+        self.lock = threading.Lock()
+        self.from_date = from_date
+        self.to_date = None
+        self.bars = []
+        self.refreshed_at = 0.0
+        self.refreshed_on = None  # date of the last refresh; bars up to the day before it are final
+        self.generation = next(_generations)
+
+class BarCache:
+    """
+    Bounded LRU cache of bar series per (symbol, timespan).
+
+    Within one generation a series only changes at its end: a refresh re-fetches from the last cached bar
+    onward, replacing that bar (it may have been a partial bar for the current day or minute) and appending
+    newer ones. Requests reaching further back than the cached series replace it with a full fetch under a new
+    generation. A range is final once it was refreshed on a later day than its end, and is not re-fetched again.
+    The least recently used series are evicted beyond `max_series` series or `max_bars` cached bars.
+
+    Attributes:
+        ttl (int): Seconds before a series that reaches today is refreshed again.
+        max_series (int): Maximum number of cached series.
+        max_bars (int): Maximum number of bars across all cached series.
+    """
+    def __init__(self, fetch=get_all_historical_prices, ttl: int = BAR_CACHE_SECONDS,
+                 max_series: int = BAR_CACHE_MAX_SERIES, max_bars: int = BAR_CACHE_MAX_BARS):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.max_series = max_series
+        self.max_bars = max_bars
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def series(self, symbol: str, timespan: str, from_date: str, to_date: str):
+        """
+        Return the cached series for a symbol and timespan, fetching only what is missing.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            timespan (str): The time granularity.
+            from_date (str): Start date in YYYY-MM-DD format.
+            to_date (str): End date in YYYY-MM-DD format.
+        Returns:
+            tuple: (bars covering at least the range, sorted by time; generation of the series;
+                    number of bars appended or replaced at the end by this call).
+                   Within a generation, earlier bars never change: only the last bar may be replaced.
+        Raises:
+            Exception: If the Polygon request fails.
+        """
+        key = (symbol.upper(), timespan)
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is None or from_date < entry.from_date:
+                entry = self._series[key] = _CachedSeries(from_date)
+            self._series.move_to_end(key)
+        with entry.lock:
+            today = date.today().isoformat()
+            covered = entry.to_date is not None and to_date <= entry.to_date
+            fresh = entry.to_date is not None and (
+                entry.refreshed_on > entry.to_date or time.time() - entry.refreshed_at < self.ttl)
+            if covered and fresh:
+                return entry.bars, entry.generation, 0
+            if not entry.bars:
+                bars = self._fetch(key[0], timespan, entry.from_date, to_date)
+                entry.bars = sorted(bars, key=lambda b: b["t"])
+                entry.generation = next(_generations)
+                added = len(entry.bars)
+            else:
+                last_t = entry.bars[-1]["t"]
+                since = datetime.fromtimestamp(last_t / 1000, tz=timezone.utc).date().isoformat()
+                new_bars = sorted((b for b in self._fetch(key[0], timespan, since, to_date) if b["t"] >= last_t),
+                                  key=lambda b: b["t"])
+                # The last cached bar is fetched again, since it may have been incomplete.
+                # Replace rather than mutate, so callers holding the previous list keep a stable snapshot.
+                kept = entry.bars[:-1] if new_bars and new_bars[0]["t"] == last_t else entry.bars
+                entry.bars = kept + new_bars
+                added = len(new_bars)
+            entry.to_date = max(to_date, entry.to_date or to_date)
+            entry.refreshed_at = time.time()
+            entry.refreshed_on = today
+            bars, generation = entry.bars, entry.generation
+        self._evict()
+        return bars, generation, added
+
+    def _evict(self):
+        with self._lock:
+            total = sum(len(entry.bars) for entry in self._series.values())
+            while len(self._series) > 1 and (len(self._series) > self.max_series or total > self.max_bars):
+                _, entry = self._series.popitem(last=False)
+                total -= len(entry.bars)
+
+    def peek(self, symbol: str, timespan: str, from_date: str, to_date: str):
+        """
+        Return cached bars for a range without fetching, if the cache fully covers it.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            timespan (str): The time granularity.
+            from_date (str): Start date in YYYY-MM-DD format.
+            to_date (str): End date in YYYY-MM-DD format.
+        Returns:
+            list | None: Bars within the range, or None if the cache does not cover it.
+        """
+        entry = self._series.get((symbol.upper(), timespan))
+        if entry is None or entry.to_date is None or from_date < entry.from_date or to_date > entry.to_date:
+            return None
+        return slice_bars(entry.bars, from_date, to_date)
+
+#------------------------------------------------------------------------
+bar_cache = BarCache()
@@ -0,0 +1,178 @@
+"""
+history_export.py
+
+This module streams bulk multi-symbol OHLCV exports as CSV or Parquet with bounded memory.
+
+Symbols are fetched by a small worker pool. Each worker pushes one page of bars at a time into a bounded queue,
+and the response generator encodes each page as a CSV chunk or a Parquet row group as soon as it arrives.
+Memory is bounded by (workers + queue size) pages regardless of how many symbols or bars are exported.
+
+- EXPORT_COLUMNS: Column order of the export.
+- ExportError: Raised mid-stream when a symbol cannot be fetched.
+- export_history: Generator of encoded export chunks (bytes) for a list of symbols.
+- parquet_available: Whether the optional pyarrow dependency is installed.
+"""
+import csv
+import io
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.core.historical_data import bar_cache, iter_historical_pages
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+#------------------------------------------------------------------------
+
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", 4))
+EXPORT_QUEUE_PAGES = int(os.getenv("EXPORT_QUEUE_PAGES", 2))
+EXPORT_CACHED_CHUNK = 50_000
+EXPORT_COLUMNS = ["symbol", "t", "o", "h", "l", "c", "v", "vw", "n"]
+
+_DONE = object()
+
+#------------------------------------------------------------------------
+class ExportError(Exception):
+    """
+    Raised from the export stream when fetching a symbol fails, so the download aborts instead of ending early.
+    """
+
+#------------------------------------------------------------------------
+def parquet_available() -> bool:
+    """
+    Return True if pyarrow is installed and Parquet exports can be produced.
+    """
+    return pq is not None
+
+#------------------------------------------------------------------------
+def _produce(symbol: str, timespan: str, from_date: str, to_date: str, out: queue.Queue, stop: threading.Event):
+    def put(item):
+        # Block while the consumer is behind, but give up promptly once the download is abandoned.
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        cached = bar_cache.peek(symbol, timespan, from_date, to_date)
+        if cached is not None:
+            pages = (cached[i:i + EXPORT_CACHED_CHUNK] for i in range(0, len(cached), EXPORT_CACHED_CHUNK))
+        else:
+            pages = iter_historical_pages(symbol, timespan, from_date, to_date)
+        for page in pages:
+            if not put((symbol, page)):
+                return
+    except Exception as e:
+        print(f"History export failed for {symbol}:", e)
+        put(ExportError(f"History export failed for {symbol}: {e}"))
+    finally:
+        put(_DONE)
+
+def _iter_pages(symbols: list, timespan: str, from_date: str, to_date: str):
+    pages = queue.Queue(maxsize=EXPORT_QUEUE_PAGES)
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS)
+    try:
+        for symbol in symbols:
+            pool.submit(_produce, symbol, timespan, from_date, to_date, pages, stop)
+        remaining = len(symbols)
+        while remaining:
+            item = pages.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            if isinstance(item, ExportError):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+#------------------------------------------------------------------------
+def _csv_chunks(pages):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for symbol, bars in pages:
+        for bar in bars:
+            writer.writerow((symbol, bar.get("t"), bar.get("o"), bar.get("h"), bar.get("l"), bar.get("c"),
+                             bar.get("v"), bar.get("vw"), bar.get("n")))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+class _ChunkSink(io.RawIOBase):
+    # Write-only file object that hands written bytes back to the generator instead of keeping them.
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _parquet_chunks(pages):
+    schema = pa.schema([
+        ("symbol", pa.string()), ("t", pa.int64()), ("o", pa.float64()), ("h", pa.float64()), ("l", pa.float64()),
+        ("c", pa.float64()), ("v", pa.float64()), ("vw", pa.float64()), ("n", pa.int64()),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for symbol, bars in pages:
+            columns = {name: [bar.get(name) for bar in bars] for name in EXPORT_COLUMNS[1:]}
+            columns["symbol"] = [symbol] * len(bars)
+            # One row group per page keeps the writer's buffered state to a single page.
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+#------------------------------------------------------------------------
+def export_history(symbols: list, timespan: str, from_date: str, to_date: str, fmt: str = "csv"):
+    """
+    Stream OHLCV bars for many symbols as a single CSV or Parquet file.
+
+    Bars are written in the order pages arrive, so rows are grouped by symbol and time-ordered within a
+    symbol, but symbols may be interleaved. If any symbol's fetch fails, the stream raises ExportError,
+    which aborts the download rather than delivering a silently truncated file.
+
+    Args:
+        symbols (list[str]): Stock ticker symbols.
+        timespan (str): The time granularity.
+        from_date (str): Start date (YYYY-MM-DD).
+        to_date (str): End date (YYYY-MM-DD).
+        fmt (str): 'csv' or 'parquet'.
+    Returns:
+        Iterator[bytes]: Encoded chunks of the export file; iterating raises ExportError if a fetch fails.
+    Raises:
+        ValueError: If the format is unknown, or Parquet is requested without pyarrow installed.
+    """
+    if fmt == "parquet" and not parquet_available():
+        raise ValueError("Parquet export requires pyarrow to be installed")
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unknown export format: {fmt}")
+    pages = _iter_pages(symbols, timespan, from_date, to_date)
+    return _csv_chunks(pages) if fmt == "csv" else _parquet_chunks(pages)
@@ -0,0 +1,162 @@
+"""
+http_cache.py
+
+This module provides HTTP caching and compression support for the FastAPI application.
+
+- ConditionalGetMiddleware: Adds content-hash ETags to JSON/image GET responses and answers matching
+  If-None-Match requests with 304 Not Modified. ETags are weak, since the body may be served compressed or not.
+- CompressionMiddleware: Compresses large responses with brotli (if brotli-asgi is installed) or gzip,
+  skipping streaming endpoints.
+- etag_matches: Weak comparison of an ETag against an If-None-Match header.
+- version_etag: Builds a weak ETag from the parts of a data version (for example a bar series' generation and last bar).
+- not_modified: Builds a 304 response for routes that can validate a cheap data version before doing any work.
+- history_cache_control: Cache-Control value for a historical date range (immutable once the range is closed).
+"""
+import hashlib
+from datetime import date
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+try:
+    from brotli_asgi import BrotliMiddleware as _Compressor
+    _COMPRESSOR_OPTIONS = {"gzip_fallback": True}
+except ImportError:  # brotli is optional; gzip is always available
+    from starlette.middleware.gzip import GZipMiddleware as _Compressor
+    _COMPRESSOR_OPTIONS = {}
+#------------------------------------------------------------------------
+
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Only bodies of these types are buffered and hashed; everything else (CSV/Parquet exports, SSE) streams through.
+_HASHED_TYPES = ("application/json", "image/svg+xml", "image/png")
+
+#------------------------------------------------------------------------
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an ETag against an If-None-Match header using weak comparison.
+
+    Args:
+        if_none_match (str | None): Raw If-None-Match request header.
+        etag (str): The current ETag.
+    Returns:
+        bool: True if the client's cached copy is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == current for tag in candidates)
+
+def version_etag(*parts) -> str:
+    """
+    Build a weak ETag identifying a data version.
+
+    Args:
+        *parts: Values that together identify the data (anything with a stable str()).
+    Returns:
+        str: Weak ETag, e.g. 'W/"3f2a..."'.
+    """
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+def not_modified(etag: str, cache_control: str = DEFAULT_CACHE_CONTROL) -> Response:
+    """
+    Build a 304 Not Modified response.
+
+    Args:
+        etag (str): The current ETag.
+        cache_control (str): Cache-Control header value.
+    Returns:
+        Response: Empty 304 response carrying the validators.
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def history_cache_control(to_date: str) -> str:
+    """
+    Choose a Cache-Control value for a historical date range.
+
+    Args:
+        to_date (str): End date of the range (YYYY-MM-DD).
+    Returns:
+        str: Immutable, year-long caching for ranges that ended before today; a short max-age otherwise.
+    """
+    if to_date < date.today().isoformat():
+        return IMMUTABLE_CACHE_CONTROL
+    return "public, max-age=60"
+
+#------------------------------------------------------------------------
+class ConditionalGetMiddleware:
+    """
+    ASGI middleware that validates GET responses with ETags.
+
+    Responses that already carry an ETag (set by the route from a data version) keep it; JSON and image
+    responses without one get a hash of their body. Every ETag leaving this middleware is weak: it runs inside
+    the compression middleware, so the same ETag covers the compressed and uncompressed representations.
+    If the request's If-None-Match matches, the body is replaced by an empty 304. Responses without
+    Cache-Control get DEFAULT_CACHE_CONTROL, so browsers revalidate.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+        body = []
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if message["status"] == 200 and content_type.startswith(_HASHED_TYPES):
+                    start = message
+                    return
+                await send(message)
+                return
+            if start is None:
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._finish(start, b"".join(body), if_none_match, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _finish(self, start, content, if_none_match, send):
+        headers = MutableHeaders(raw=start["headers"])
+        etag = headers.get("etag")
+        if etag is None:
+            etag = '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+        if not etag.startswith("W/"):
+            etag = "W/" + etag
+        headers["ETag"] = etag
+        if "cache-control" not in headers:
+            headers["Cache-Control"] = DEFAULT_CACHE_CONTROL
+        if etag_matches(if_none_match, etag):
+            response = not_modified(etag, headers["cache-control"])
+            await send({"type": "http.response.start", "status": 304, "headers": response.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send(start)
+        await send({"type": "http.response.body", "body": content})
+
+#------------------------------------------------------------------------
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses of at least `minimum_size` bytes (brotli if available, else gzip).
+    Paths starting with one of `exclude_prefixes` (live streams) are never compressed, so events are not held back.
+    """
+    def __init__(self, app, minimum_size: int = 1024, exclude_prefixes: tuple = ("/stream",)):
+        self.app = app
+        self.compressed = _Compressor(app, minimum_size=minimum_size, **_COMPRESSOR_OPTIONS)
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith(self.exclude_prefixes):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
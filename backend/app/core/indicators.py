@@ -0,0 +1,371 @@
+"""
+indicators.py
+
+This module provides a vectorized technical indicator engine over cached historical bars.
+
+Indicators are computed with NumPy kernels over the whole series once, then kept per (symbol, timespan)
+together with their rolling state (window tails and last smoothed values). When new bars are appended to the
+bar cache, each indicator is extended from that state over just the new bars instead of being recomputed;
+a revised last bar (a partial bar that was still forming) is recomputed from a checkpoint one bar earlier.
+
+Supported names: sma_<n>, ema_<n>, rsi_<n>, macd[_<fast>_<slow>_<signal>], bbands_<n>[_<k>].
+
+- parse_indicator: Parses an indicator name into a configured indicator object.
+- IndicatorEngine: Caches indicator series per (symbol, timespan) and keeps them in step with the bar cache.
+- indicator_engine: Shared IndicatorEngine instance over the shared bar cache.
+"""
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import numpy as np
+from app.core.historical_data import BAR_CACHE_MAX_SERIES, bar_cache, date_to_ms
+#------------------------------------------------------------------------
+
+MAX_PERIOD = 500
+_NAME_RE = re.compile(r"^(sma|ema|rsi|macd|bbands)((?:_\d+(?:\.\d+)?)*)$")
+
+#------------------------------------------------------------------------
+# Kernels
+#------------------------------------------------------------------------
+def ema_kernel(x: np.ndarray, alpha: float, prev: float) -> np.ndarray:
+    """
+    Exponential smoothing y[t] = (1 - alpha) * y[t-1] + alpha * x[t], vectorized.
+
+    Uses the closed form y[t] = beta^(t+1) * prev + alpha * beta^t * cumsum(x[j] * beta^-j), evaluated in blocks
+    short enough that beta^-j cannot overflow.
+
+    Args:
+        x (np.ndarray): Input series.
+        alpha (float): Smoothing factor in (0, 1].
+        prev (float): Smoothed value just before x[0].
+    Returns:
+        np.ndarray: Smoothed series, same length as x.
+    """
+    out = np.empty(len(x), dtype=float)
+    beta = 1.0 - alpha
+    if beta <= 0.0:
+        out[:] = x
+        return out
+    block = max(1, int(300 / -np.log(beta)))
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        k = np.arange(len(chunk))
+        decay = beta ** k
+        out[start:start + len(chunk)] = beta * decay * prev + alpha * decay * np.cumsum(chunk / decay)
+        prev = out[start + len(chunk) - 1]
+    return out
+
+def rolling_mean(x: np.ndarray, n: int) -> np.ndarray:
+    """
+    Trailing n-period mean; the first n-1 values are NaN.
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        cs = np.cumsum(np.concatenate(([0.0], x)))
+        out[n - 1:] = (cs[n:] - cs[:-n]) / n
+    return out
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    """
+    Trailing n-period population standard deviation; the first n-1 values are NaN.
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        windows = np.lib.stride_tricks.sliding_window_view(x, n)
+        out[n - 1:] = windows.std(axis=1)
+    return out
+
+#------------------------------------------------------------------------
+# Indicators
+#------------------------------------------------------------------------
+class _Indicator(ABC):
+    """
+    Base class. `compute` runs over a full close series and returns (outputs, state);
+    `update` extends from state over new closes and returns outputs for just those closes.
+    A state of None means the warm-up period is not complete, and callers fall back to `compute`.
+    """
+    outputs = ()
+
+    @abstractmethod
+    def compute(self, closes: np.ndarray):
+        """
+        Return (dict of output name -> values for every close, state after the last close).
+        """
+
+    @abstractmethod
+    def update(self, state, new_closes: np.ndarray):
+        """
+        Return (dict of output name -> values for just the new closes, state after the last of them).
+        """
+
+class _WindowIndicator(_Indicator):
+    # Window indicators only need the last n-1 closes to continue.
+    def __init__(self, n: int):
+        self.n = n
+
+    @abstractmethod
+    def _series(self, closes: np.ndarray) -> dict:
+        """
+        Return a dict of output name -> values for every close.
+        """
+
+    def compute(self, closes):
+        state = closes[-(self.n - 1):].copy() if len(closes) >= self.n - 1 else None
+        return self._series(closes), state
+
+    def update(self, tail, new_closes):
+        joined = np.concatenate((tail, new_closes))
+        outputs = {name: values[len(tail):] for name, values in self._series(joined).items()}
+        return outputs, joined[-len(tail):].copy()
+
+class SMA(_WindowIndicator):
+    outputs = ("sma",)
+
+    def _series(self, closes):
+        return {"sma": rolling_mean(closes, self.n)}
+
+class BollingerBands(_WindowIndicator):
+    outputs = ("middle", "upper", "lower")
+
+    def __init__(self, n: int, k: float = 2.0):
+        super().__init__(n)
+        self.k = k
+
+    def _series(self, closes):
+        middle = rolling_mean(closes, self.n)
+        width = self.k * rolling_std(closes, self.n)
+        return {"middle": middle, "upper": middle + width, "lower": middle - width}
+
+class EMA(_Indicator):
+    outputs = ("ema",)
+
+    def __init__(self, n: int):
+        self.n = n
+        self.alpha = 2.0 / (n + 1)
+
+    def compute(self, closes):
+        out = np.full(len(closes), np.nan)
+        if len(closes) < self.n:
+            return {"ema": out}, None
+        # Seeded with the simple average of the first n closes.
+        seed = closes[:self.n].mean()
+        out[self.n - 1] = seed
+        out[self.n:] = ema_kernel(closes[self.n:], self.alpha, seed)
+        return {"ema": out}, out[-1]
+
+    def update(self, last, new_closes):
+        out = ema_kernel(new_closes, self.alpha, last)
+        return {"ema": out}, out[-1]
+
+class RSI(_Indicator):
+    outputs = ("rsi",)
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def _rsi(self, avg_gain, avg_loss):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+
+    def compute(self, closes):
+        out = np.full(len(closes), np.nan)
+        if len(closes) <= self.n:
+            return {"rsi": out}, None
+        delta = np.diff(closes)
+        gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+        # Wilder smoothing, seeded with the simple average of the first n changes.
+        g0, l0 = gains[:self.n].mean(), losses[:self.n].mean()
+        avg_gain = np.concatenate(([g0], ema_kernel(gains[self.n:], 1.0 / self.n, g0)))
+        avg_loss = np.concatenate(([l0], ema_kernel(losses[self.n:], 1.0 / self.n, l0)))
+        out[self.n:] = self._rsi(avg_gain, avg_loss)
+        return {"rsi": out}, (closes[-1], avg_gain[-1], avg_loss[-1])
+
+    def update(self, state, new_closes):
+        last_close, g0, l0 = state
+        delta = np.diff(np.concatenate(([last_close], new_closes)))
+        avg_gain = ema_kernel(np.clip(delta, 0, None), 1.0 / self.n, g0)
+        avg_loss = ema_kernel(np.clip(-delta, 0, None), 1.0 / self.n, l0)
+        return {"rsi": self._rsi(avg_gain, avg_loss)}, (new_closes[-1], avg_gain[-1], avg_loss[-1])
+
+class MACD(_Indicator):
+    outputs = ("macd", "signal", "hist")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        if fast >= slow:
+            raise ValueError("MACD fast period must be shorter than the slow period")
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+
+    def compute(self, closes):
+        fast, fast_state = self.fast.compute(closes)
+        slow, slow_state = self.slow.compute(closes)
+        macd = fast["ema"] - slow["ema"]
+        signal = np.full(len(closes), np.nan)
+        start = self.slow.n - 1
+        signal_state = None
+        if len(closes) > start:
+            signal_values, signal_state = self.signal.compute(macd[start:])
+            signal[start:] = signal_values["ema"]
+        outputs = {"macd": macd, "signal": signal, "hist": macd - signal}
+        if signal_state is None:
+            return outputs, None
+        return outputs, (fast_state, slow_state, signal_state)
+
+    def update(self, state, new_closes):
+        fast_state, slow_state, signal_state = state
+        fast, fast_state = self.fast.update(fast_state, new_closes)
+        slow, slow_state = self.slow.update(slow_state, new_closes)
+        macd = fast["ema"] - slow["ema"]
+        signal, signal_state = self.signal.update(signal_state, macd)
+        return {"macd": macd, "signal": signal["ema"], "hist": macd - signal["ema"]}, (fast_state, slow_state, signal_state)
+
+#------------------------------------------------------------------------
+def parse_indicator(name: str) -> _Indicator:
+    """
+    Parse an indicator name such as 'sma_20', 'rsi_14', 'macd' or 'bbands_20_2'.
+
+    Args:
+        name (str): Indicator name.
+    Returns:
+        _Indicator: Configured indicator.
+    Raises:
+        ValueError: If the name or its parameters are invalid.
+    """
+    match = _NAME_RE.match(name.strip().lower())
+    if not match:
+        raise ValueError(f"Unknown indicator: {name}")
+    kind = match.group(1)
+    params = [float(p) for p in match.group(2).split("_")[1:]]
+    periods = [int(p) for p in params[:3 if kind == "macd" else 1]]
+    if any(p < 2 or p > MAX_PERIOD for p in periods):
+        raise ValueError(f"Indicator periods must be between 2 and {MAX_PERIOD}: {name}")
+    if kind == "macd":
+        if len(params) not in (0, 3):
+            raise ValueError("MACD takes no parameters or fast_slow_signal, e.g. macd_12_26_9")
+        return MACD(*periods) if periods else MACD()
+    if len(params) not in ((1, 2) if kind == "bbands" else (1,)):
+        raise ValueError(f"Invalid parameters for indicator: {name}")
+    if kind == "bbands":
+        return BollingerBands(periods[0], params[1] if len(params) > 1 else 2.0)
+    return {"sma": SMA, "ema": EMA, "rsi": RSI}[kind](periods[0])
+
+#------------------------------------------------------------------------
+# Engine
+#------------------------------------------------------------------------
+class _IndicatorSeries:
+    # Keeps the indicator state after the last close and a checkpoint state one close earlier,
+    # so a revised last bar is recomputed from the checkpoint instead of from scratch.
+    def __init__(self, indicator: _Indicator, closes: np.ndarray):
+        self.indicator = indicator
+        self._compute(closes)
+
+    def _compute(self, closes: np.ndarray):
+        self.values, self.checkpoint = self.indicator.compute(closes[:-1])
+        if self.checkpoint is None or not len(closes):
+            self.values, self.state = self.indicator.compute(closes)
+            self.checkpoint = None
+        else:
+            last, self.state = self.indicator.update(self.checkpoint, closes[-1:])
+            self.values = {k: np.concatenate((self.values[k], last[k])) for k in self.values}
+        self.length = len(closes)
+
+    def extend(self, closes: np.ndarray, stable: int):
+        """
+        Bring the series in step with `closes`, of which the first `stable` are unchanged since the last call.
+        """
+        if stable >= self.length:
+            state, base = self.state, self.length
+        elif stable == self.length - 1 and self.checkpoint is not None:
+            state, base = self.checkpoint, stable
+        else:
+            self._compute(closes)
+            return
+        new_closes = closes[base:]
+        if not len(new_closes):
+            return
+        if state is None:
+            self._compute(closes)
+            return
+        values = {k: v[:base] for k, v in self.values.items()}
+        if len(new_closes) > 1:
+            head, state = self.indicator.update(state, new_closes[:-1])
+            values = {k: np.concatenate((values[k], head[k])) for k in values}
+        last, self.state = self.indicator.update(state, new_closes[-1:])
+        self.checkpoint = state
+        self.values = {k: np.concatenate((values[k], last[k])) for k in values}
+        self.length = len(closes)
+
+class _SymbolSeries:
+    def __init__(self, generation: int):
+        self.lock = threading.Lock()
+        self.generation = generation
+        self.times = np.empty(0, dtype=np.int64)
+        self.closes = np.empty(0, dtype=float)
+        self.indicators = {}
+
+class IndicatorEngine:
+    """
+    Computes and caches indicator series per (symbol, timespan) on top of a BarCache.
+
+    Attributes:
+        max_series (int): Maximum number of (symbol, timespan) series kept; least recently used are evicted.
+    """
+    def __init__(self, bars=bar_cache, max_series: int = BAR_CACHE_MAX_SERIES):
+        self._bars = bars
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compute(self, symbol: str, timespan: str, names: list, from_date: str, to_date: str) -> dict:
+        """
+        Return indicator values for the bars of a symbol within a date range.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            timespan (str): The time granularity.
+            names (list[str]): Indicator names, e.g. ['sma_20', 'rsi_14', 'macd'].
+            from_date (str): Start date (YYYY-MM-DD).
+            to_date (str): End date (YYYY-MM-DD).
+        Returns:
+            dict: Bar timestamps 't' and, per indicator name, a dict of output name -> list of values (None during warm-up).
+        Raises:
+            ValueError: If an indicator name is invalid.
+            Exception: If fetching bars fails.
+        """
+        parsed = {name: parse_indicator(name) for name in dict.fromkeys(names)}
+        bars, generation, _ = self._bars.series(symbol, timespan, from_date, to_date)
+        key = (symbol.upper(), timespan)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None or series.generation != generation:
+                series = self._series[key] = _SymbolSeries(generation)
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        with series.lock:
+            known = len(series.closes)
+            # Within a generation only the last known bar can have been revised.
+            stable = known
+            if known and (len(bars) < known or bars[known - 1]["c"] != series.closes[known - 1]):
+                stable = known - 1
+            if stable < known or len(bars) != known:
+                series.times = np.fromiter((b["t"] for b in bars), dtype=np.int64, count=len(bars))
+                series.closes = np.fromiter((b["c"] for b in bars), dtype=float, count=len(bars))
+                for cached in series.indicators.values():
+                    cached.extend(series.closes, stable)
+            lo = int(np.searchsorted(series.times, date_to_ms(from_date), side="left"))
+            hi = int(np.searchsorted(series.times, date_to_ms(to_date, end_of_day=True), side="right"))
+            result = {"t": series.times[lo:hi].tolist(), "indicators": {}}
+            for name, indicator in parsed.items():
+                cached = series.indicators.get(name)
+                if cached is None:
+                    cached = series.indicators[name] = _IndicatorSeries(indicator, series.closes)
+                result["indicators"][name] = {k: _to_list(v[lo:hi]) for k, v in cached.values.items()}
+        return result
+
+def _to_list(values: np.ndarray) -> list:
+    return [None if v != v else round(v, 6) for v in values.tolist()]
+
+#------------------------------------------------------------------------
+indicator_engine = IndicatorEngine()
@@ -2,7 +2,7 @@
 init_db.py
 
 This module provides a function to initialize the database schema for the FastAPI application.
-It creates all tables defined in the SQLAlchemy models (User and Watchlist models).
+It creates all tables defined in the SQLAlchemy models (User, Watchlist, AlertRule and AlertEvent models).
 
 - init_db: Creates all tables in the database using SQLAlchemy metadata.
 """
@@ -0,0 +1,167 @@
+"""
+news_search.py
+
+This module provides an incrementally maintained, in-process inverted index for full-text search over cached news.
+
+Articles are added as the news store pulls them in and removed when the store evicts them, so queries are
+answered entirely from memory with BM25 ranking and never touch Finnhub.
+
+- tokenize: Lower-cases and splits text into index terms, dropping common stop words.
+- NewsSearchIndex: Inverted index over headline, summary, source and related symbols with BM25 scoring.
+- news_index: Shared NewsSearchIndex instance fed by the news store.
+"""
+import heapq
+import math
+import re
+import threading
+#------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the to was were will with".split()
+)
+# Headline terms count this many times, so a word in the headline outranks the same word in the summary.
+_HEADLINE_WEIGHT = 2
+
+#------------------------------------------------------------------------
+def tokenize(text: str) -> list:
+    """
+    Split text into lower-cased index terms, dropping stop words.
+
+    Args:
+        text (str): Text to tokenize.
+    Returns:
+        list[str]: Index terms in order of appearance.
+    """
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOP_WORDS]
+
+#------------------------------------------------------------------------
+class NewsSearchIndex:
+    """
+    Inverted index over news articles with BM25 ranking and symbol/date filters.
+
+    An article cross-posted under several symbols is indexed once and remembers every symbol it was cached under;
+    it is dropped from the index only when no symbol's cache holds it any more.
+
+    Attributes:
+        k1 (float): BM25 term-frequency saturation parameter.
+        b (float): BM25 document-length normalization parameter.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}  # term -> {article_id: term frequency}
+        self._docs = {}      # article_id -> (article, length, datetime, filter symbols, caching symbols)
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    #--------------------------------------------------------------------
+    def _terms(self, article: dict) -> dict:
+        terms = tokenize(article.get("headline")) * _HEADLINE_WEIGHT
+        terms += tokenize(article.get("summary"))
+        terms += tokenize(article.get("source"))
+        terms += tokenize((article.get("related") or "").replace(",", " "))
+        counts = {}
+        for t in terms:
+            counts[t] = counts.get(t, 0) + 1
+        return counts
+
+    def add(self, symbol: str, articles: list):
+        """
+        Index articles cached under a symbol. Already indexed articles just gain the symbol.
+
+        Args:
+            symbol (str): The symbol the articles were fetched for.
+            articles (list[dict]): Finnhub news articles.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            for article in articles:
+                article_id = article.get("id")
+                if article_id is None:
+                    continue
+                doc = self._docs.get(article_id)
+                if doc is not None:
+                    doc[3].add(symbol)
+                    doc[4].add(symbol)
+                    continue
+                counts = self._terms(article)
+                length = sum(counts.values())
+                related = {s.strip().upper() for s in (article.get("related") or "").split(",") if s.strip()}
+                self._docs[article_id] = (article, length, int(article.get("datetime", 0)), related | {symbol}, {symbol})
+                self._total_length += length
+                for term, tf in counts.items():
+                    self._postings.setdefault(term, {})[article_id] = tf
+
+    def remove(self, symbol: str, articles: list):
+        """
+        Drop a symbol from articles evicted from its cache, unindexing articles no symbol holds any more.
+
+        Args:
+            symbol (str): The symbol whose cache evicted the articles.
+            articles (list[dict]): Evicted news articles.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            for article in articles:
+                article_id = article.get("id")
+                doc = self._docs.get(article_id)
+                if doc is None:
+                    continue
+                doc[4].discard(symbol)
+                if doc[4]:
+                    continue
+                del self._docs[article_id]
+                self._total_length -= doc[1]
+                for term in self._terms(doc[0]):
+                    postings = self._postings.get(term)
+                    if postings is not None:
+                        postings.pop(article_id, None)
+                        if not postings:
+                            del self._postings[term]
+
+    #--------------------------------------------------------------------
+    def search(self, query: str, symbols: list = None, from_ts: int = None, to_ts: int = None, limit: int = 20) -> list:
+        """
+        Rank indexed articles against a query with BM25.
+
+        Args:
+            query (str): Free-text query, e.g. 'fda approval'.
+            symbols (list[str], optional): Only return articles related to any of these symbols.
+            from_ts (int, optional): Only return articles published at or after this unix time.
+            to_ts (int, optional): Only return articles published at or before this unix time.
+            limit (int): Maximum number of results.
+        Returns:
+            list[dict]: Matching articles, best first, each with a 'score' field.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        wanted = {s.upper() for s in symbols} if symbols else None
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            scores = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for article_id, tf in postings.items():
+                    _, length, published, doc_symbols, _ = self._docs[article_id]
+                    if from_ts is not None and published < from_ts:
+                        continue
+                    if to_ts is not None and published > to_ts:
+                        continue
+                    if wanted is not None and wanted.isdisjoint(doc_symbols):
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[article_id] = scores.get(article_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+            top = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], self._docs[kv[0]][2]))
+            return [dict(self._docs[article_id][0], score=round(score, 4)) for article_id, score in top]
+
+#------------------------------------------------------------------------
+news_index = NewsSearchIndex()
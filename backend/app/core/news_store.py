@@ -0,0 +1,319 @@
+"""
+news_store.py
+
+This module provides an incremental, deduplicated in-memory news cache on top of Finnhub company news.
+
+Each symbol remembers the publish time of its newest article. A refresh only asks Finnhub for articles
+since that day and merges the ones whose id has not been seen yet, so repeat refreshes are small deltas.
+Articles are kept newest first and paged with an opaque "before" cursor. At most NEWS_MAX_SYMBOLS symbols are
+cached; the least recently used symbol is evicted (and its articles dropped from the search index) beyond that.
+
+- NewsStore: Bounded per-symbol news cache with incremental refresh, cursor paging and a k-way merged multi-symbol feed.
+- encode_cursor / decode_cursor: Convert an article position to and from a "before" cursor string.
+- news_store: Shared NewsStore instance used by the routers, feeding the shared full-text news index.
+- global_feed_symbols: Symbols of the global feed (GLOBAL_NEWS_SYMBOLS plus every watched symbol).
+- start_news_refresher: Background thread keeping the global feed's symbols refreshed, so the feed is served from cache.
+"""
+import heapq
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from app.core.database import SessionLocal
+from app.core.crud_watchlist import get_watched_symbols
+from app.core.news_data import get_news_for_symbol
+from app.core.news_search import news_index
+#------------------------------------------------------------------------
+
+NEWS_REFRESH_SECONDS = int(os.getenv("NEWS_REFRESH_SECONDS", 300))
+NEWS_LOOKBACK_DAYS = int(os.getenv("NEWS_LOOKBACK_DAYS", 30))
+NEWS_MAX_PER_SYMBOL = int(os.getenv("NEWS_MAX_PER_SYMBOL", 2000))
+# Should comfortably exceed the number of global feed symbols, which are touched on every refresh round.
+NEWS_MAX_SYMBOLS = int(os.getenv("NEWS_MAX_SYMBOLS", 1024))
+NEWS_REFRESH_WORKERS = int(os.getenv("NEWS_REFRESH_WORKERS", 8))
+# Symbols always included in the global feed, in addition to everything on users' watchlists.
+GLOBAL_NEWS_SYMBOLS = [s.strip().upper() for s in os.getenv("GLOBAL_NEWS_SYMBOLS", "").split(",") if s.strip()]
+
+#------------------------------------------------------------------------
+def _sort_key(article: dict):
+    # Ascending order of this key is newest first; the id breaks ties between articles published together.
+    return (-int(article.get("datetime", 0)), -int(article.get("id", 0)))
+
+def encode_cursor(article: dict) -> str:
+    """
+    Build a "before" cursor pointing just past the given article.
+
+    Args:
+        article (dict): A news article with 'datetime' and 'id' fields.
+    Returns:
+        str: Cursor string of the form '<datetime>:<id>'.
+    """
+    return f"{int(article.get('datetime', 0))}:{int(article.get('id', 0))}"
+
+def decode_cursor(cursor: str):
+    """
+    Parse a "before" cursor into a sort key.
+
+    Args:
+        cursor (str): Cursor of the form '<datetime>:<id>' (or just '<datetime>').
+    Returns:
+        tuple: Sort key comparable with stored article keys.
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    ts, _, article_id = cursor.partition(":")
+    if not article_id:
+        # A bare timestamp means "strictly older than this time".
+        return (-int(ts), float("inf"))
+    return (-int(ts), -int(article_id))
+
+#------------------------------------------------------------------------
+class _SymbolNews:
+    """
+    Cached news for a single symbol. `articles` and `keys` are replaced together on every merge,
+    so readers can take a consistent snapshot without holding the lock.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = ([], [])  # (articles newest first, matching sort keys)
+        self.ids = set()
+        self.newest = None
+        self.refreshed_at = 0.0
+        self.evicted = False
+
+#------------------------------------------------------------------------
+class NewsStore:
+    """
+    Incremental, deduplicated per-symbol news cache.
+
+    Attributes:
+        ttl (int): Seconds a symbol's news is considered fresh before the next refresh hits Finnhub.
+        lookback_days (int): How far back the first fetch for a symbol reaches.
+        max_per_symbol (int): Maximum number of articles kept per symbol (oldest are dropped).
+        max_symbols (int): Maximum number of symbols kept (least recently used are evicted).
+        index (NewsSearchIndex | None): Search index kept in sync with the cached articles.
+    """
+    def __init__(self, fetch=get_news_for_symbol, ttl: int = NEWS_REFRESH_SECONDS,
+                 lookback_days: int = NEWS_LOOKBACK_DAYS, max_per_symbol: int = NEWS_MAX_PER_SYMBOL,
+                 max_symbols: int = NEWS_MAX_SYMBOLS, index=None):
+        self._fetch = fetch
+        self.index = index
+        self.ttl = ttl
+        self.lookback_days = lookback_days
+        self.max_per_symbol = max_per_symbol
+        self.max_symbols = max_symbols
+        self._symbols = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def _entry(self, symbol: str) -> _SymbolNews:
+        with self._lock:
+            entry = self._symbols.get(symbol)
+            if entry is None:
+                entry = self._symbols[symbol] = _SymbolNews()
+            self._symbols.move_to_end(symbol)
+            evicted = []
+            while len(self._symbols) > self.max_symbols:
+                evicted.append(self._symbols.popitem(last=False))
+        for old_symbol, old in evicted:
+            self._evict(old_symbol, old)
+        return entry
+
+    def _evict(self, symbol: str, entry: _SymbolNews):
+        # Waits for an in-flight refresh of the entry, which then sees `evicted` and starts over on a new entry.
+        with entry.lock:
+            entry.evicted = True
+            articles, _ = entry.snapshot
+            entry.snapshot, entry.ids = ([], []), set()
+            if self.index is not None:
+                self.index.remove(symbol, articles)
+
+    #--------------------------------------------------------------------
+    def refresh(self, symbol: str, force: bool = False) -> list:
+        """
+        Fetch articles published since the newest cached one and merge them in.
+        Does nothing if the symbol was refreshed within the TTL, unless `force` is set.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            force (bool): Refresh even if the cached news is still fresh.
+        Returns:
+            list: Newly added articles (empty if nothing new or the cache was fresh).
+        Raises:
+            Exception: If the Finnhub request fails.
+        """
+        symbol = symbol.upper()
+        entry = self._entry(symbol)
+        with entry.lock:
+            if entry.evicted:
+                return self.refresh(symbol, force)
+            if not force and time.time() - entry.refreshed_at < self.ttl:
+                return []
+            if entry.newest is None:
+                since = datetime.now(timezone.utc) - timedelta(days=self.lookback_days)
+            else:
+                since = datetime.fromtimestamp(entry.newest, tz=timezone.utc)
+            fetched = self._fetch(symbol, since.date().isoformat())
+
+            fresh = []
+            for article in fetched:
+                article_id = article.get("id")
+                if article_id is None or article_id in entry.ids:
+                    continue
+                entry.ids.add(article_id)
+                fresh.append(article)
+            if fresh:
+                articles, _ = entry.snapshot
+                merged = sorted(fresh + articles, key=_sort_key)
+                dropped = merged[self.max_per_symbol:]
+                for article in dropped:
+                    entry.ids.discard(article.get("id"))
+                merged = merged[:self.max_per_symbol]
+                entry.snapshot = (merged, [_sort_key(a) for a in merged])
+                entry.newest = int(merged[0].get("datetime", 0))
+                if self.index is not None:
+                    self.index.add(symbol, fresh)
+                    self.index.remove(symbol, dropped)
+            entry.refreshed_at = time.time()
+            return fresh
+
+    def refresh_many(self, symbols: list):
+        """
+        Refresh several symbols concurrently. Symbols that are still fresh cost nothing, and a failing
+        symbol is skipped so one upstream error does not take down a whole multi-symbol feed.
+
+        Args:
+            symbols (list[str]): Symbols to refresh.
+        """
+        def refresh_quietly(symbol):
+            try:
+                self.refresh(symbol)
+            except Exception as e:
+                print(f"News refresh failed for {symbol}:", e)
+
+        with ThreadPoolExecutor(max_workers=NEWS_REFRESH_WORKERS) as pool:
+            list(pool.map(refresh_quietly, symbols))
+
+    def articles(self, symbol: str) -> tuple:
+        """
+        Return the cached articles and their sort keys for a symbol without refreshing.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+        Returns:
+            tuple: (articles newest first, sort keys) — both empty if nothing is cached.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            entry = self._symbols.get(symbol)
+            if entry is None:
+                return [], []
+            self._symbols.move_to_end(symbol)
+        return entry.snapshot
+
+    def page(self, symbol: str, limit: int = 50, before: str = None) -> tuple:
+        """
+        Return one page of cached articles for a symbol, newest first.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+            limit (int): Maximum number of articles.
+            before (str, optional): Cursor from a previous page; only older articles are returned.
+        Returns:
+            tuple: (list of articles, cursor for the next page or None).
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        articles, keys = self.articles(symbol)
+        start = bisect_right(keys, decode_cursor(before)) if before else 0
+        page = articles[start:start + limit]
+        has_more = start + limit < len(articles)
+        return page, (encode_cursor(page[-1]) if page and has_more else None)
+
+    def merged_page(self, symbols: list, limit: int = 50, before: str = None) -> tuple:
+        """
+        Return one page of a feed merging the cached news of several symbols, newest first.
+
+        Each symbol's cache is already sorted, so this is a heap-based k-way merge: positioning every stream
+        at the cursor is a binary search, and each returned article costs one O(log k) heap operation.
+        Articles cross-posted under several symbols (same id or url) are returned once.
+
+        Args:
+            symbols (list[str]): Symbols whose news streams are merged.
+            limit (int): Maximum number of articles.
+            before (str, optional): Cursor from a previous page; only older articles are returned.
+        Returns:
+            tuple: (list of articles, cursor for the next page or None).
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        start_key = decode_cursor(before) if before else None
+        heap = []
+        for n, symbol in enumerate(dict.fromkeys(s.upper() for s in symbols)):
+            articles, keys = self.articles(symbol)
+            i = bisect_right(keys, start_key) if start_key else 0
+            if i < len(keys):
+                heap.append((keys[i], n, i, articles, keys))
+        heapq.heapify(heap)
+
+        page, seen = [], set()
+        while heap and len(page) < limit:
+            _, n, i, articles, keys = heap[0]
+            article = articles[i]
+            if i + 1 < len(keys):
+                heapq.heapreplace(heap, (keys[i + 1], n, i + 1, articles, keys))
+            else:
+                heapq.heappop(heap)
+            dedupe = {("id", article.get("id")), ("url", article.get("url") or article.get("id"))}
+            if seen & dedupe:
+                continue
+            seen |= dedupe
+            page.append(article)
+        return page, (encode_cursor(page[-1]) if page and heap else None)
+
+#------------------------------------------------------------------------
+news_store = NewsStore(index=news_index)
+
+#------------------------------------------------------------------------
+def global_feed_symbols(db) -> list:
+    """
+    Return the symbols merged into the global news feed.
+
+    Args:
+        db (Session): SQLAlchemy session.
+    Returns:
+        list[str]: GLOBAL_NEWS_SYMBOLS followed by every symbol on any user's watchlist, without duplicates.
+    """
+    return list(dict.fromkeys(GLOBAL_NEWS_SYMBOLS + get_watched_symbols(db)))
+
+def start_news_refresher(interval: int = NEWS_REFRESH_SECONDS):
+    """
+    Start a daemon thread that refreshes the news of every global feed symbol now and then every `interval` seconds.
+    Requests for the global feed only read the cache, so they never wait on Finnhub.
+
+    Args:
+        interval (int): Seconds between refresh rounds.
+    Returns:
+        threading.Thread: The started refresher thread.
+    """
+    def run():
+        while True:
+            try:
+                db = SessionLocal()
+                try:
+                    symbols = global_feed_symbols(db)
+                finally:
+                    db.close()
+                news_store.refresh_many(symbols)
+            except Exception as e:
+                print("News refresh round failed:", e)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="news-refresher", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,246 @@
+"""
+price_stream.py
+
+This module provides live price streaming with a single upstream feed per symbol, fanned out to any number of clients.
+
+The hub runs at most one feed task per symbol no matter how many clients watch it. Each client gets a conflating
+mailbox that keeps only the latest update per symbol, so a slow consumer sees fewer, fresher updates instead of
+an ever-growing backlog, and never slows down the feed or other clients. If a feed fails, its subscribers
+receive an update with an 'error' field (and 'price' None) and are detached from the symbol.
+
+- PriceFeed: Abstract base class for pluggable price sources.
+- PolygonPollingFeed: Polls Polygon.io's last-trade endpoint for a symbol.
+- ReplayFeed: Replays stored bars as price updates (for tests and local development).
+- Subscription: A client's conflating mailbox of price updates.
+- PriceStreamHub: Manages per-symbol feed tasks and fans updates out to subscriptions.
+- price_hub: Shared PriceStreamHub instance; the feed is chosen with the PRICE_FEED environment variable.
+"""
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from app.core.stock_data import get_last_trade
+from app.core.historical_data import get_historical_prices
+#------------------------------------------------------------------------
+
+PRICE_FEED = os.getenv("PRICE_FEED", "polygon")
+PRICE_POLL_SECONDS = float(os.getenv("PRICE_POLL_SECONDS", 5))
+PRICE_REPLAY_SECONDS = float(os.getenv("PRICE_REPLAY_SECONDS", 1))
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------
+class PriceFeed(ABC):
+    """
+    Base class for price sources.
+    """
+    @abstractmethod
+    def updates(self, symbol: str):
+        """
+        Return an async iterator of price updates for one symbol: dicts with at least 'symbol', 'price'
+        and 't' (milliseconds since epoch). Raising ends the symbol's stream with an error for its subscribers.
+
+        Args:
+            symbol (str): The stock ticker symbol.
+        """
+
+#------------------------------------------------------------------------
+class PolygonPollingFeed(PriceFeed):
+    """
+    Price feed that polls Polygon.io's last-trade endpoint and yields only when the trade changes.
+
+    Failed polls are retried on the next interval. An outage is logged once when the first symbol starts
+    failing and once when every symbol has recovered, not once per poll and symbol.
+
+    Attributes:
+        interval (float): Seconds between polls.
+    """
+    def __init__(self, interval: float = PRICE_POLL_SECONDS):
+        self.interval = interval
+        self._failing = set()  # symbols whose latest poll failed
+
+    async def updates(self, symbol: str):
+        loop = asyncio.get_running_loop()
+        last = None
+        try:
+            while True:
+                try:
+                    trade = await loop.run_in_executor(None, get_last_trade, symbol)
+                except Exception as e:
+                    self._poll_failed(symbol, e)
+                else:
+                    self._poll_succeeded(symbol)
+                    if trade != last:
+                        last = trade
+                        yield trade
+                await asyncio.sleep(self.interval)
+        finally:
+            self._failing.discard(symbol)
+
+    def _poll_failed(self, symbol: str, error: Exception):
+        if symbol in self._failing:
+            return
+        if not self._failing:
+            logger.warning("Price polling failing (first: %s): %s", symbol, error)
+        else:
+            logger.debug("Price polling also failing for %s: %s", symbol, error)
+        self._failing.add(symbol)
+
+    def _poll_succeeded(self, symbol: str):
+        if symbol in self._failing:
+            self._failing.discard(symbol)
+            if not self._failing:
+                logger.info("Price polling recovered")
+
+#------------------------------------------------------------------------
+class ReplayFeed(PriceFeed):
+    """
+    Price feed that replays OHLCV bars as a stream of close prices.
+
+    Attributes:
+        bars (dict | None): Bars per symbol to replay; symbols not present are loaded with get_historical_prices.
+        interval (float): Seconds between replayed updates.
+        loop (bool): Start over from the first bar once the series is exhausted.
+    """
+    def __init__(self, bars: dict = None, interval: float = PRICE_REPLAY_SECONDS, loop: bool = False):
+        self.bars = bars or {}
+        self.interval = interval
+        self.loop = loop
+
+    async def updates(self, symbol: str):
+        bars = self.bars.get(symbol)
+        if bars is None:
+            bars = await asyncio.get_running_loop().run_in_executor(None, get_historical_prices, symbol)
+        while True:
+            for bar in bars:
+                yield {"symbol": symbol, "price": bar.get("c"), "size": bar.get("v"), "t": bar.get("t")}
+                await asyncio.sleep(self.interval)
+            if not self.loop or not bars:
+                return
+
+#------------------------------------------------------------------------
+class Subscription:
+    """
+    A client's mailbox of pending price updates, holding at most one (the latest) update per symbol.
+
+    Attributes:
+        symbols (set[str]): Symbols this subscription is registered for.
+        conflated (int): Number of updates overwritten before the client read them.
+    """
+    def __init__(self):
+        self.symbols = set()
+        self.conflated = 0
+        self._pending = {}
+        self._ready = asyncio.Event()
+
+    def push(self, update: dict):
+        """
+        Queue an update, replacing any unread update for the same symbol. Never blocks.
+
+        Args:
+            update (dict): Price update.
+        """
+        if update["symbol"] in self._pending:
+            self.conflated += 1
+        self._pending[update["symbol"]] = update
+        self._ready.set()
+
+    async def get(self) -> list:
+        """
+        Wait for and return all pending updates (one per symbol).
+
+        Returns:
+            list[dict]: Latest unread update for each symbol that changed.
+        """
+        await self._ready.wait()
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self._ready.clear()
+        return batch
+
+#------------------------------------------------------------------------
+class PriceStreamHub:
+    """
+    Fan-out hub holding one feed task per watched symbol.
+
+    All methods must be called from the event loop thread.
+
+    Attributes:
+        feed (PriceFeed): Source of price updates; swap in a ReplayFeed for tests.
+    """
+    def __init__(self, feed: PriceFeed):
+        self.feed = feed
+        self._subscribers = {}  # symbol -> set of Subscription
+        self._tasks = {}        # symbol -> asyncio.Task
+        self._latest = {}       # symbol -> last update seen
+
+    def subscribe(self, subscription: Subscription, symbols: list):
+        """
+        Register a subscription for symbols, starting a feed task for symbols nobody watched yet.
+        The latest known price of each symbol is delivered immediately.
+
+        Args:
+            subscription (Subscription): The client's mailbox.
+            symbols (list[str]): Symbols to watch.
+        """
+        for symbol in {s.upper() for s in symbols}:
+            subscription.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(subscription)
+            if symbol not in self._tasks:
+                self._tasks[symbol] = asyncio.create_task(self._pump(symbol))
+            elif symbol in self._latest:
+                subscription.push(self._latest[symbol])
+
+    def unsubscribe(self, subscription: Subscription, symbols: list = None):
+        """
+        Unregister a subscription from symbols (all of its symbols by default), stopping feed tasks nobody needs.
+
+        Args:
+            subscription (Subscription): The client's mailbox.
+            symbols (list[str], optional): Symbols to stop watching.
+        """
+        for symbol in {s.upper() for s in symbols} if symbols is not None else set(subscription.symbols):
+            subscription.symbols.discard(symbol)
+            watchers = self._subscribers.get(symbol)
+            if watchers is None:
+                continue
+            watchers.discard(subscription)
+            if not watchers:
+                del self._subscribers[symbol]
+                self._latest.pop(symbol, None)
+                task = self._tasks.pop(symbol, None)
+                if task is not None:
+                    task.cancel()
+
+    def stats(self) -> dict:
+        """
+        Return the number of upstream feeds and client subscriptions per symbol.
+
+        Returns:
+            dict: Symbol -> number of subscriptions.
+        """
+        return {symbol: len(watchers) for symbol, watchers in self._subscribers.items()}
+
+    async def _pump(self, symbol: str):
+        try:
+            async for update in self.feed.updates(symbol):
+                self._latest[symbol] = update
+                for subscription in list(self._subscribers.get(symbol, ())):
+                    subscription.push(update)
+        except Exception as e:
+            logger.exception("Price feed failed for %s", symbol)
+            self._fail(symbol, str(e))
+        finally:
+            if self._tasks.get(symbol) is asyncio.current_task():
+                del self._tasks[symbol]
+
+    def _fail(self, symbol: str, detail: str):
+        # Tell every subscriber the feed is gone and detach them, so a later subscribe starts a fresh feed.
+        error = {"symbol": symbol, "price": None, "error": f"Price feed failed: {detail}"}
+        for subscription in self._subscribers.pop(symbol, set()):
+            subscription.symbols.discard(symbol)
+            subscription.push(error)
+        self._latest.pop(symbol, None)
+
+#------------------------------------------------------------------------
+price_hub = PriceStreamHub(ReplayFeed(loop=True) if PRICE_FEED == "replay" else PolygonPollingFeed())
@@ -0,0 +1,35 @@
+"""
+responses.py
+
+This module provides a fast JSON response class for data-heavy routes.
+
+FastAPI's default path runs every returned value through `jsonable_encoder` (a recursive Python walk that
+copies the whole payload) and then `json.dumps`. For large lists of plain dicts built from trusted internal
+data, that walk is redundant. Routes that return FastJSONResponse directly skip it, along with response_model
+validation, and the payload is encoded once by orjson's native encoder.
+
+- FastJSONResponse: JSON response rendered with orjson (falls back to the standard encoder if orjson is not installed).
+"""
+from fastapi.responses import JSONResponse
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard encoder still works, just slower
+    orjson = None
+#------------------------------------------------------------------------
+
+# NumPy scalars/arrays are encoded natively; dict keys such as ints or dates are converted to strings.
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+#------------------------------------------------------------------------
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson.
+
+    Return an instance directly from a route (rather than a dict) so FastAPI does not run `jsonable_encoder`
+    or response_model validation first. The content must already be JSON-compatible: dicts, lists, str,
+    numbers, bools, None, NumPy values, datetimes or dataclasses.
+    """
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
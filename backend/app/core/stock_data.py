@@ -1,11 +1,11 @@
 """
 stock_data.py
 
-This module provides functions to fetch stock summary data and chart URLs from Yahoo Finance for use in the FastAPI backend.
+This module provides functions to fetch stock summary data and last trades for use in the FastAPI backend.
 
 Functions:
 - get_stock_summary: Fetches detailed stock summary data using yfinance.
-- get_stock_chart_image: Constructs a Yahoo Finance chart URL for embedding in the frontend.
+- get_last_trade: Fetches the most recent trade for a stock symbol from Polygon.io.
 """
 import os
 import requests
@@ -39,16 +39,22 @@ def get_stock_summary(symbol: str):
 
 #------------------------------------------------------------------------
 
-def get_stock_chart_image(symbol: str, period='1mo', interval='1d'):
+def get_last_trade(symbol: str):
     """
-    Construct a Yahoo Finance chart URL for a given stock symbol.
+    Fetch the most recent trade for a given stock symbol from Polygon.io.
 
     Args:
-        symbol (str): The stock ticker symbol.
-        period (str, optional): Chart period (unused, for future extension).
-        interval (str, optional): Chart interval (unused, for future extension).
+        symbol (str): The stock ticker symbol (e.g., 'AAPL').
     Returns:
-        str: URL to Yahoo Finance chart page for embedding.
+        dict: Symbol, trade price, trade size and timestamp (milliseconds since epoch).
+    Raises:
+        ValueError: If the request fails or data is missing.
     """
-    chart_url = f"https://finance.yahoo.com/chart/{symbol}?p={symbol}"
-    return chart_url  # Frontend can embed this as an iframe or image
+    url = f"https://api.polygon.io/v2/last/trade/{symbol.upper()}?apiKey={POLYGON_API_KEY}"
+    resp = requests.get(url)
+    if resp.status_code != 200:
+        raise ValueError(f"Polygon.io API returned status {resp.status_code}: {resp.text[:200]}")
+    trade = resp.json().get("results")
+    if not trade:
+        raise ValueError(f"No trade data found for symbol: {symbol}")
+    return {"symbol": symbol.upper(), "price": trade.get("p"), "size": trade.get("s"), "t": int(trade.get("t", 0)) // 1_000_000}
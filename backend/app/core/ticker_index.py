@@ -0,0 +1,254 @@
+"""
+ticker_index.py
+
+This module provides an in-memory ticker search and autocomplete index built from Polygon.io's ticker reference list.
+
+The index is rebuilt periodically in a background thread and swapped in atomically, so lookups never block on
+an upstream call and never see a half-built index. Rate-limited pages (HTTP 429) are retried with backoff, and a
+failed rebuild keeps serving the previous index.
+
+- TickerIndex: Immutable search index over symbols and company names (sorted arrays plus a trigram index).
+- fetch_ticker_reference: Downloads the full active ticker reference list from Polygon.io.
+- refresh_ticker_index: Rebuilds the index from Polygon.io and swaps it in.
+- get_ticker_index: Returns the current index (None until the first build completes).
+- start_ticker_index_refresher: Starts the background thread that keeps the index fresh.
+"""
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+import requests
+from dotenv import load_dotenv
+#------------------------------------------------------------------------
+
+load_dotenv()
+POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
+TICKER_INDEX_REFRESH_SECONDS = int(os.getenv("TICKER_INDEX_REFRESH_SECONDS", 24 * 60 * 60))
+# Polygon's free plan allows 5 requests a minute, so a 429 usually clears within a few tens of seconds.
+TICKER_FETCH_MAX_RETRIES = int(os.getenv("TICKER_FETCH_MAX_RETRIES", 6))
+TICKER_FETCH_BACKOFF_SECONDS = float(os.getenv("TICKER_FETCH_BACKOFF_SECONDS", 15))
+_MAX_RETRY_DELAY = 300
+
+# Trigrams shared by more than this fraction of all entries carry almost no signal
+# ("inc", "cor", ...) and would make fuzzy lookups scan most of the index.
+_MAX_TRIGRAM_DF = 0.05
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_index = None
+
+#------------------------------------------------------------------------
+def _normalize(text: str) -> str:
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+#------------------------------------------------------------------------
+class TickerIndex:
+    """
+    Immutable prefix and fuzzy search index over ticker symbols and company names.
+
+    Symbols and name tokens are kept in sorted arrays so prefix lookups are a binary search plus a short scan.
+    Fuzzy matching uses a trigram inverted index scored by Jaccard similarity.
+
+    Attributes:
+        entries (list[dict]): Ticker records (symbol, name, exchange, type).
+        built_at (float): Unix time at which the index was built.
+    """
+    def __init__(self, tickers: list):
+        self.entries = []
+        seen = set()
+        for t in tickers:
+            symbol = (t.get("ticker") or "").upper()
+            if not symbol or symbol in seen:
+                continue
+            seen.add(symbol)
+            self.entries.append({
+                "symbol": symbol,
+                "name": t.get("name") or "",
+                "exchange": t.get("primary_exchange"),
+                "type": t.get("type"),
+            })
+        self.built_at = time.time()
+
+        # Sorted (key, entry_id) arrays for prefix lookups.
+        self._symbols = sorted((e["symbol"], i) for i, e in enumerate(self.entries))
+        self._symbol_keys = [s for s, _ in self._symbols]
+        self._name_tokens = [_normalize(e["name"]).split() for e in self.entries]
+        tokens = []
+        for i, name_tokens in enumerate(self._name_tokens):
+            for pos, tok in enumerate(name_tokens):
+                tokens.append((tok, pos, i))
+        tokens.sort()
+        self._tokens = tokens
+        self._token_keys = [t for t, _, _ in tokens]
+
+        # Trigram postings over "symbol name" for fuzzy matching.
+        postings = {}
+        self._trigram_counts = []
+        for i, e in enumerate(self.entries):
+            grams = _trigrams(_normalize(f"{e['symbol']} {e['name']}"))
+            self._trigram_counts.append(len(grams))
+            for g in grams:
+                postings.setdefault(g, []).append(i)
+        max_df = max(1, int(len(self.entries) * _MAX_TRIGRAM_DF))
+        self._trigrams = {g: ids for g, ids in postings.items() if len(ids) <= max_df}
+
+    def __len__(self):
+        return len(self.entries)
+
+    #--------------------------------------------------------------------
+    def _prefix_scan(self, keys: list, prefix: str, limit: int):
+        start = bisect_left(keys, prefix)
+        end = start
+        while end < len(keys) and end - start < limit and keys[end].startswith(prefix):
+            end += 1
+        return start, end
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Search the index by symbol prefix, company-name prefix and fuzzy match.
+
+        Args:
+            query (str): User input, e.g. 'aap' or 'micros'.
+            limit (int): Maximum number of results to return.
+        Returns:
+            list[dict]: Ranked ticker records, each with a 'score' field.
+        """
+        q_symbol = query.strip().upper()
+        q_norm = _normalize(query)
+        if not q_norm:
+            return []
+        scores = {}
+
+        def bump(entry_id, score):
+            if score > scores.get(entry_id, 0.0):
+                scores[entry_id] = score
+
+        # Symbol prefix: an exact match ranks first, shorter completions next.
+        scan = limit * 4
+        start, end = self._prefix_scan(self._symbol_keys, q_symbol, scan)
+        for symbol, i in self._symbols[start:end]:
+            bump(i, 100.0 if symbol == q_symbol else 80.0 - min(len(symbol) - len(q_symbol), 10))
+
+        # Company name prefix on every query word; leading words of the name rank higher.
+        # Scan on the longest (most selective) word and check the others per candidate.
+        words = q_norm.split()
+        pivot = max(words, key=len)
+        others = [w for w in words if w is not pivot]
+        start, end = self._prefix_scan(self._token_keys, pivot, scan * 4)
+        for _, pos, i in self._tokens[start:end]:
+            if others and not self._name_has_words(i, others):
+                continue
+            bump(i, 60.0 - min(pos, 10))
+
+        # Fuzzy trigram match only when prefix matching has not filled the page.
+        if len(scores) < limit and len(q_norm) >= 3:
+            grams = _trigrams(q_norm)
+            shared = Counter()
+            for g in grams:
+                for i in self._trigrams.get(g, ()):
+                    shared[i] += 1
+            for i, n in shared.most_common(scan):
+                jaccard = n / (len(grams) + self._trigram_counts[i] - n)
+                if jaccard >= 0.2:
+                    bump(i, 40.0 * jaccard)
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], len(self.entries[kv[0]]["symbol"]), self.entries[kv[0]]["symbol"]))
+        return [dict(self.entries[i], score=round(score, 3)) for i, score in ranked[:limit]]
+
+    def _name_has_words(self, entry_id: int, words: list) -> bool:
+        name_tokens = self._name_tokens[entry_id]
+        return all(any(t.startswith(w) for t in name_tokens) for w in words)
+
+#------------------------------------------------------------------------
+def _retry_delay(resp, attempt: int) -> float:
+    # Honour a numeric Retry-After; otherwise back off exponentially.
+    try:
+        delay = float(resp.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        delay = TICKER_FETCH_BACKOFF_SECONDS * 2 ** attempt
+    return min(max(delay, 0.0), _MAX_RETRY_DELAY)
+
+def fetch_ticker_reference():
+    """
+    Fetch the full list of active stock tickers from Polygon.io, following pagination.
+    A rate-limited page is retried (up to TICKER_FETCH_MAX_RETRIES times) without losing the pages already fetched.
+
+    Returns:
+        list: Ticker reference records from Polygon.io.
+    Raises:
+        Exception: If the API request fails, or a page is still rate limited after all retries.
+    """
+    url = f"https://api.polygon.io/v3/reference/tickers?market=stocks&active=true&limit=1000&apiKey={POLYGON_API_KEY}"
+    tickers = []
+    attempt = 0
+    while url:
+        resp = requests.get(url)
+        if resp.status_code == 429 and attempt < TICKER_FETCH_MAX_RETRIES:
+            time.sleep(_retry_delay(resp, attempt))
+            attempt += 1
+            continue
+        attempt = 0
+        if resp.status_code != 200:
+            raise Exception(f"Polygon API error: {resp.status_code} {resp.text}")
+        data = resp.json()
+        tickers.extend(data.get("results", []))
+        next_url = data.get("next_url")
+        url = f"{next_url}&apiKey={POLYGON_API_KEY}" if next_url else None
+    return tickers
+
+#------------------------------------------------------------------------
+def refresh_ticker_index():
+    """
+    Rebuild the ticker index from Polygon.io and atomically replace the current one.
+    If the fetch fails or returns no tickers, the current index stays in place.
+
+    Returns:
+        TickerIndex: The newly built index.
+    Raises:
+        Exception: If the fetch fails or returns no tickers.
+    """
+    global _index
+    tickers = fetch_ticker_reference()
+    if not tickers:
+        raise Exception("Polygon returned no tickers")
+    index = TickerIndex(tickers)
+    _index = index
+    return index
+
+def get_ticker_index():
+    """
+    Return the current ticker index.
+
+    Returns:
+        TickerIndex | None: The current index, or None if the first build has not finished yet.
+    """
+    return _index
+
+#------------------------------------------------------------------------
+def start_ticker_index_refresher(interval: int = TICKER_INDEX_REFRESH_SECONDS):
+    """
+    Start a daemon thread that builds the ticker index immediately and then rebuilds it every `interval` seconds.
+    A failed rebuild keeps serving the previous index and is retried after a short delay.
+
+    Args:
+        interval (int): Seconds between successful rebuilds.
+    Returns:
+        threading.Thread: The started refresher thread.
+    """
+    def run():
+        while True:
+            try:
+                refresh_ticker_index()
+                time.sleep(interval)
+            except Exception as e:
+                print("Ticker index refresh failed:", e)
+                time.sleep(min(interval, 300))
+
+    thread = threading.Thread(target=run, name="ticker-index-refresher", daemon=True)
+    thread.start()
+    return thread
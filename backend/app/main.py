@@ -4,9 +4,11 @@ main.py
 This is the entry point for the FastAPI application.
 
 - Initializes the FastAPI app instance.
+- Adds CORS, response compression and ETag/conditional GET middleware.
 - Defines the root endpoint ("/") for a basic health check or welcome message.
-- Includes all routers for user, watchlist, stock, news, historical, and admin endpoints.
-- Runs database initialization on application startup to ensure all tables are created.
+- Includes all routers for user, watchlist, stock, news, historical, stream, backtest, alerts, and admin endpoints.
+- Runs database initialization on application startup to ensure all tables are created, then starts the alert scheduler.
+- Stops the backtest sweep worker pool on shutdown.
 """
 from fastapi import FastAPI
 from fastapi.security import OAuth2PasswordBearer
@@ -16,8 +18,16 @@ from app.routers import stock
 from app.routers import news
 from app.routers import historical
 from app.routers import admin
+from app.routers import stream
+from app.routers import backtest
+from app.routers import alerts
 from app.core.init_db import init_db
+from app.core.ticker_index import start_ticker_index_refresher
+from app.core.news_store import start_news_refresher
+from app.core.alert_engine import alert_scheduler
+from app.core.backtest import shutdown_sweep_pool
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.http_cache import ConditionalGetMiddleware, CompressionMiddleware
 #------------------------------------------------------------------------
 
 app = FastAPI(
@@ -30,10 +40,16 @@ app = FastAPI(
         {"name": "Stock", "description": "Stock summary and chart endpoints."},
         {"name": "Stock History", "description": "Historical OHLCV and stats endpoints."},
         {"name": "News", "description": "Stock and global news endpoints."},
+        {"name": "Alerts", "description": "Price alert rules on watchlist symbols and the alert inbox."},
+        {"name": "Backtest", "description": "Strategy backtests and parameter sweeps over historical bars."},
+        {"name": "Stream", "description": "Live price streaming endpoints (WebSocket and SSE)."},
         {"name": "Admin", "description": "Admin endpoints."}
     ]
 )
 
+# Middleware added later wraps earlier ones: CORS -> compression -> ETag validation -> routes.
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # or ["*"] for all origins (dev only) -- http://localhost:3000
@@ -50,6 +66,9 @@ app.include_router(stock.router)
 app.include_router(news.router)
 app.include_router(historical.router)
 app.include_router(admin.router)
+app.include_router(stream.router)
+app.include_router(backtest.router)
+app.include_router(alerts.router)
 #------------------------------------------------------------------------
 
 @app.get("/")
@@ -65,6 +84,24 @@ def read_root():
 def on_startup():
     """
     FastAPI startup event handler.
-    Initializes the database tables at application startup.
+    Initializes the database tables and starts building the ticker search index and refreshing news in the background.
     """
-    init_db()
\ No newline at end of file
+    init_db()
+    start_ticker_index_refresher()
+    start_news_refresher()
+
+@app.on_event("startup")
+async def start_alerts():
+    """
+    FastAPI startup event handler.
+    Loads active alert rules and starts evaluating them against live prices (runs after on_startup).
+    """
+    await alert_scheduler.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """
+    FastAPI shutdown event handler.
+    Stops the backtest sweep worker processes.
+    """
+    shutdown_sweep_pool()
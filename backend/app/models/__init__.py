@@ -6,6 +6,7 @@ This module initializes the SQLAlchemy declarative base and imports all model cl
 - Base: Declarative base for all models.
 - User: User model.
 - Watchlist: Watchlist model.
+- AlertRule, AlertEvent: Price alert rule and fired-alert inbox models.
 """
 #------------------------------------------------------------------------
 from sqlalchemy.orm import declarative_base
@@ -13,4 +14,5 @@ Base = declarative_base()
 
 #------------------------------------------------------------------------
 from .user import User
-from .watchlist import Watchlist 
\ No newline at end of file
+from .watchlist import Watchlist
+from .alert import AlertRule, AlertEvent
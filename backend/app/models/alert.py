@@ -0,0 +1,70 @@
+"""
+alert.py
+
+This module defines the SQLAlchemy models for price alerts in the FastAPI application.
+
+- AlertRule: A threshold or percent-move rule attached to a user's watchlist entry.
+- AlertEvent: A fired alert in the user's inbox.
+- Base: Declarative base for SQLAlchemy models (imported from models package).
+"""
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from . import Base
+#------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------
+class AlertRule(Base):
+    """
+    SQLAlchemy model for the 'alert_rules' table.
+
+    Attributes:
+        id (int): Primary key, unique rule ID.
+        user_id (int): Foreign key referencing the user.
+        watchlist_id (int): Foreign key referencing the watchlist entry the rule is attached to.
+        stock_symbol (str): Stock symbol being watched.
+        kind (str): 'above', 'below', 'pct_up' or 'pct_down'.
+        threshold (float): Price level (above/below) or percent move (pct_up/pct_down).
+        reference_price (float): Price percent moves are measured from.
+        level (float): Absolute price that triggers the rule.
+        active (bool): False once the rule has fired.
+        created_at (datetime): Creation time (UTC).
+    """
+    __tablename__ = "alert_rules"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    watchlist_id = Column(Integer, ForeignKey("watchlists.id"), nullable=False, index=True)
+    stock_symbol = Column(String, nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    threshold = Column(Float, nullable=False)
+    reference_price = Column(Float, nullable=True)
+    level = Column(Float, nullable=False)
+    active = Column(Boolean, default=True, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+#------------------------------------------------------------------------
+class AlertEvent(Base):
+    """
+    SQLAlchemy model for the 'alert_events' table (the alert inbox).
+
+    Attributes:
+        id (int): Primary key, unique event ID.
+        rule_id (int): The rule that fired (kept after the rule is deleted).
+        user_id (int): Foreign key referencing the user.
+        stock_symbol (str): Stock symbol that triggered the alert.
+        kind (str): Kind of the rule that fired.
+        level (float): Trigger level of the rule.
+        price (float): Price that triggered the rule.
+        triggered_at (datetime): Time the alert fired (UTC).
+        read (bool): Whether the user has marked the alert as read.
+    """
+    __tablename__ = "alert_events"
+    id = Column(Integer, primary_key=True, index=True)
+    rule_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    stock_symbol = Column(String, nullable=False)
+    kind = Column(String, nullable=False)
+    level = Column(Float, nullable=False)
+    price = Column(Float, nullable=False)
+    triggered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    read = Column(Boolean, default=False, nullable=False)
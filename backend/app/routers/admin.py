@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.routers.user import get_current_user
 from app.models.user import User
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -26,10 +27,11 @@ def require_admin(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin privileges required")
     return current_user
 
-@router.get("/admin/users", tags=["Admin"])
+@router.get("/admin/users", response_class=FastJSONResponse, tags=["Admin"])
 def list_users(current_user: User = Depends(require_admin), db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return [{"id": u.id, "email": u.email} for u in users]
+    # Only the two columns are selected, so no ORM objects are built per user.
+    rows = db.query(User.id, User.email).all()
+    return FastJSONResponse([{"id": user_id, "email": email} for user_id, email in rows])
 
 @router.get("/admin/logs", tags=["Admin"])
 def view_logs(current_user: User = Depends(require_admin)):
@@ -0,0 +1,153 @@
+"""
+alerts.py (routers)
+
+This module defines the API routes for price alerts on watchlist symbols in the FastAPI application.
+
+- /alerts (POST): Attach a threshold or percent-move rule to a symbol on the user's watchlist.
+- /alerts (GET): List the user's alert rules.
+- /alerts/{rule_id} (DELETE): Delete an alert rule.
+- /alerts/inbox (GET): Page through fired alerts, newest first.
+- /alerts/inbox/{event_id}/read (POST): Mark a fired alert as read.
+"""
+from typing import Optional
+import requests
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.alert_engine import alert_engine, alert_scheduler
+from app.core.crud_alert import (
+    alert_level, create_alert_rule, delete_alert_rule, get_alert_events, get_alert_rules, mark_alert_event_read,
+)
+from app.core.stock_data import get_last_trade
+from app.models.watchlist import Watchlist
+from app.schemas.alert import AlertEventRead, AlertRuleCreate, AlertRuleRead
+from app.routers.user import get_current_user
+#------------------------------------------------------------------------
+
+router = APIRouter()
+
+#------------------------------------------------------------------------
+def get_db():
+    """
+    Dependency that provides a SQLAlchemy database session.
+    Yields:
+        Session: SQLAlchemy session object.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+#------------------------------------------------------------------------
+@router.post("/alerts", response_model=AlertRuleRead, tags=["Alerts"])
+def create_alert(item: AlertRuleCreate, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Attach an alert rule to a symbol on the user's watchlist.
+    Percent-move rules are measured from `reference_price`, or from the latest trade if it is omitted.
+    A rule fires when the price crosses its level, so when the latest trade was fetched, rules whose level
+    it has already reached are rejected rather than firing on the next tick.
+    Args:
+        item (AlertRuleCreate): Symbol, rule kind and threshold.
+        db (Session): Database session (injected).
+    Returns:
+        AlertRuleRead: The created rule.
+    Raises:
+        HTTPException: If the symbol is not on the watchlist, the latest price cannot be fetched,
+                       or the price is already past the rule's level.
+    """
+    watch = db.query(Watchlist).filter(
+        Watchlist.user_id == current_user.id,
+        func.upper(Watchlist.stock_symbol) == item.stock_symbol.upper()
+    ).first()
+    if not watch:
+        raise HTTPException(status_code=404, detail="Stock not found in watchlist")
+    price, reference_price = None, item.reference_price
+    if item.kind.startswith("pct_") and reference_price is None:
+        try:
+            price = get_last_trade(watch.stock_symbol)["price"]
+        except (ValueError, requests.RequestException) as e:
+            raise HTTPException(status_code=502, detail=f"Latest price unavailable: {e}")
+        if price is None:
+            raise HTTPException(status_code=502, detail="Latest price unavailable")
+        reference_price = price
+    level = alert_level(item.kind, item.threshold, reference_price)
+    rising = item.kind in ("above", "pct_up")
+    if price is not None and (price >= level if rising else price <= level):
+        raise HTTPException(
+            status_code=400,
+            detail=f"{watch.stock_symbol.upper()} is already {'at or above' if rising else 'at or below'} {level:.4f} (last trade {price})",
+        )
+    rule = create_alert_rule(db, watch, item.kind, item.threshold, reference_price)
+    alert_engine.add(rule.id, rule.stock_symbol, rule.kind, rule.level)
+    alert_scheduler.watch(rule.stock_symbol)
+    return rule
+
+#------------------------------------------------------------------------
+@router.get("/alerts", response_model=list[AlertRuleRead], tags=["Alerts"])
+def list_alerts(active_only: bool = False, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    List the user's alert rules, newest first.
+    Args:
+        active_only (bool): Only return rules that have not fired.
+        db (Session): Database session (injected).
+    Returns:
+        list[AlertRuleRead]: The user's rules.
+    """
+    return get_alert_rules(db, current_user.id, active_only)
+
+#------------------------------------------------------------------------
+@router.get("/alerts/inbox", response_model=list[AlertEventRead], tags=["Alerts"])
+def alert_inbox(
+    unread_only: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    before_id: Optional[int] = None,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Page through the user's fired alerts, newest first.
+    Args:
+        unread_only (bool): Only return unread alerts.
+        limit (int): Maximum number of alerts.
+        before_id (int, optional): Return alerts older than this event ID.
+        db (Session): Database session (injected).
+    Returns:
+        list[AlertEventRead]: Fired alerts.
+    """
+    return get_alert_events(db, current_user.id, unread_only, limit, before_id)
+
+#------------------------------------------------------------------------
+@router.post("/alerts/inbox/{event_id}/read", response_model=AlertEventRead, tags=["Alerts"])
+def read_alert(event_id: int, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Mark a fired alert as read.
+    Args:
+        event_id (int): The alert event's ID.
+        db (Session): Database session (injected).
+    Returns:
+        AlertEventRead: The updated alert.
+    Raises:
+        HTTPException: If the alert is not found.
+    """
+    event = mark_alert_event_read(db, current_user.id, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return event
+
+#------------------------------------------------------------------------
+@router.delete("/alerts/{rule_id}", status_code=204, tags=["Alerts"])
+def delete_alert(rule_id: int, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Delete one of the user's alert rules.
+    Args:
+        rule_id (int): The rule's ID.
+        db (Session): Database session (injected).
+    Raises:
+        HTTPException: If the rule is not found.
+    """
+    rule = delete_alert_rule(db, current_user.id, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    alert_engine.remove(rule_id)
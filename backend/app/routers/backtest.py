@@ -0,0 +1,90 @@
+"""
+backtest.py (routers)
+
+This module defines the API routes for backtesting strategies against historical bars in the FastAPI application.
+
+- /backtest (POST): Run one strategy and return its equity curve, trades and summary statistics.
+- /backtest/sweep (POST): Run a strategy over a grid of parameters in parallel and return the best combinations.
+"""
+import itertools
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import ValidationError
+from app.core.backtest import SweepBusyError, run_backtest, run_sweep
+from app.core.historical_data import bar_cache, slice_bars
+from app.schemas.backtest import BacktestRequest, StrategySpec, SweepRequest
+#------------------------------------------------------------------------
+
+router = APIRouter()
+
+MAX_SWEEP_COMBINATIONS = 5000
+
+#------------------------------------------------------------------------
+def _load_series(request: BacktestRequest):
+    try:
+        bars, _, _ = bar_cache.series(request.symbol, request.timespan, request.from_date, request.to_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    bars = slice_bars(bars, request.from_date, request.to_date)
+    if len(bars) < 2:
+        raise HTTPException(status_code=404, detail="Not enough historical data for this range")
+    times = np.fromiter((b["t"] for b in bars), dtype=np.int64, count=len(bars))
+    closes = np.fromiter((b["c"] for b in bars), dtype=float, count=len(bars))
+    return times, closes
+
+#------------------------------------------------------------------------
+@router.post("/backtest", tags=["Backtest"])
+def backtest(request: BacktestRequest):
+    """
+    Run a strategy against historical bars.
+    Args:
+        request (BacktestRequest): Symbol, range and strategy spec.
+    Returns:
+        dict: Summary statistics, trades and equity curve.
+    Raises:
+        HTTPException: If the strategy is invalid or data cannot be loaded.
+    """
+    times, closes = _load_series(request)
+    try:
+        result = run_backtest(times, closes, request.strategy.dict(), request.timespan)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"symbol": request.symbol, "timespan": request.timespan, "from": request.from_date, "to": request.to_date,
+            "strategy": request.strategy.dict(), **result}
+
+#------------------------------------------------------------------------
+@router.post("/backtest/sweep", tags=["Backtest"])
+def backtest_sweep(request: SweepRequest):
+    """
+    Run a strategy for every combination of the grid values across a process pool.
+    Args:
+        request (SweepRequest): Symbol, range, base strategy spec and parameter grid.
+    Returns:
+        dict: Number of combinations run and the best results ranked by `sort_by`.
+    Raises:
+        HTTPException: If the grid is invalid or too large, data cannot be loaded, or too many sweeps are running.
+    """
+    base = request.strategy.dict()
+    unknown = set(request.grid) - set(base) - {"type"}
+    if unknown or not request.grid:
+        raise HTTPException(status_code=400, detail=f"Grid must name strategy parameters; unknown: {sorted(unknown)}")
+    n_combinations = int(np.prod([len(v) for v in request.grid.values()]))
+    if not 0 < n_combinations <= MAX_SWEEP_COMBINATIONS:
+        raise HTTPException(status_code=400, detail=f"Grid must have between 1 and {MAX_SWEEP_COMBINATIONS} combinations")
+    try:
+        specs = [StrategySpec(**{**base, **dict(zip(request.grid, values))}).dict()
+                 for values in itertools.product(*request.grid.values())]
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    times, closes = _load_series(request)
+    try:
+        results = run_sweep(closes, specs, request.timespan)
+    except SweepBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    ranked = sorted(
+        (r for r in results if r.get("stats") and r["stats"].get(request.sort_by) is not None),
+        key=lambda r: r["stats"][request.sort_by],
+        reverse=True,
+    )
+    return {"symbol": request.symbol, "timespan": request.timespan, "from": request.from_date, "to": request.to_date,
+            "combinations": len(specs), "failed": sum("error" in r for r in results), "results": ranked[:request.top]}
@@ -1,26 +1,50 @@
 """
 historical.py (routers)
 
-This module defines the API route for fetching historical price data from Polygon.io in the FastAPI application.
+This module defines the API routes for fetching historical price data from Polygon.io in the FastAPI application.
 
 - /stock/{symbol}/history (GET): Fetch historical price data for a given stock symbol and date range.
+- /stock/history/export (GET): Stream OHLCV bars for many symbols as one CSV or Parquet download.
+- /stock/{symbol}/indicators (GET): Compute technical indicators (SMA, EMA, RSI, MACD, Bollinger bands) over historical bars.
 """
 #------------------------------------------------------------------------
-from fastapi import APIRouter, HTTPException, Query
-from app.core.historical_data import get_historical_prices
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.core.historical_data import bar_cache, get_historical_prices, slice_bars
+from app.core.indicators import indicator_engine
+from app.core.history_export import export_history
+from app.core.http_cache import etag_matches, history_cache_control, not_modified, version_etag
+from app.core.responses import FastJSONResponse
 #------------------------------------------------------------------------
 
 router = APIRouter()
+
+MAX_EXPORT_SYMBOLS = 1000
+#------------------------------------------------------------------------
+def _cached_bars(symbol: str, timespan: str, from_date: str, to_date: str):
+    # Bars of the range from the shared bar cache, with the parts identifying their version: within a
+    # generation bars are only appended or the last one revised, so the count and the end bars pin the data.
+    # Every field of the end bars counts, since a revised partial bar may change only its volume or range.
+    bars, generation, _ = bar_cache.series(symbol, timespan, from_date, to_date)
+    bars = slice_bars(bars, from_date, to_date)
+    first, last = (bars[0], bars[-1]) if bars else ({}, {})
+    version = (symbol.upper(), timespan, from_date, to_date, generation, len(bars),
+               sorted(first.items()), sorted(last.items()))
+    return bars, version
+
 #------------------------------------------------------------------------
-@router.get("/stock/{symbol}/history", tags=["Stock History"])
+@router.get("/stock/{symbol}/history", response_class=FastJSONResponse, tags=["Stock History"])
 def historical_prices(
     symbol: str,
+    request: Request,
     timespan: str = Query("day", enum=["minute", "hour", "day", "week", "month", "quarter", "year"]),
     from_date: str = Query("2024-01-01"),
     to_date: str = Query("2025-07-10")
 ):
     """
     Fetch historical price data for a given stock symbol and date range.
+    Bars are served from the shared bar cache. The ETag is derived from the cached data's version,
+    so a repeat view of unchanged data is answered with 304 before the response is serialized.
     Args:
         symbol (str): The stock ticker symbol.
         timespan (str): The time granularity.
@@ -32,20 +56,28 @@ def historical_prices(
         HTTPException: If the fetch fails.
     """
     try:
-        data = get_historical_prices(symbol, timespan, from_date, to_date)
-        return {"symbol": symbol, "timespan": timespan, "from": from_date, "to": to_date, "prices": data}
+        data, version = _cached_bars(symbol, timespan, from_date, to_date)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    etag, cache_control = version_etag("history", *version), history_cache_control(to_date)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, cache_control)
+    return FastJSONResponse(
+        {"symbol": symbol, "timespan": timespan, "from": from_date, "to": to_date, "prices": data},
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
 
 @router.get("/stock/{symbol}/history/summary", tags=["Stock History"])
 def historical_summary(
     symbol: str,
+    response: Response,
     timespan: str = Query("day", enum=["minute", "hour", "day", "week", "month", "quarter", "year"]),
     from_date: str = Query("2024-01-01"),
     to_date: str = Query("2025-07-10")
 ):
     try:
         data = get_historical_prices(symbol, timespan, from_date, to_date)
+        response.headers["Cache-Control"] = history_cache_control(to_date)
         closes = [d["c"] for d in data if "c" in d]
         if not closes:
             return {"symbol": symbol, "timespan": timespan, "from": from_date, "to": to_date, "summary": {}}
@@ -57,3 +89,84 @@ def historical_summary(
         return {"symbol": symbol, "timespan": timespan, "from": from_date, "to": to_date, "summary": summary}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stock/{symbol}/indicators", response_class=FastJSONResponse, tags=["Stock History"])
+def indicators(
+    symbol: str,
+    request: Request,
+    names: str = Query(..., description="Comma-separated indicators, e.g. sma_20,ema_50,rsi_14,macd,bbands_20_2"),
+    timespan: str = Query("day", enum=["minute", "hour", "day", "week", "month", "quarter", "year"]),
+    from_date: str = Query("2024-01-01"),
+    to_date: str = Query("2025-07-10")
+):
+    """
+    Compute technical indicators for a given stock symbol and date range.
+    Values are cached per symbol and timespan and extended incrementally as new bars arrive.
+    The ETag is derived from the bars' version and the indicator names, so unchanged data is answered with 304
+    before any indicator is computed or serialized.
+    Args:
+        symbol (str): The stock ticker symbol.
+        names (str): Comma-separated indicator names.
+        timespan (str): The time granularity.
+        from_date (str): Start date (YYYY-MM-DD).
+        to_date (str): End date (YYYY-MM-DD).
+    Returns:
+        dict: Symbol, timespan, date range, bar timestamps and indicator values (null during warm-up).
+    Raises:
+        HTTPException: If an indicator name is invalid or the fetch fails.
+    """
+    name_list = [n.strip() for n in names.split(",") if n.strip()]
+    if not name_list or len(name_list) > 10:
+        raise HTTPException(status_code=400, detail="Provide between 1 and 10 indicator names")
+    try:
+        _, version = _cached_bars(symbol, timespan, from_date, to_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    etag, cache_control = version_etag("indicators", ",".join(name_list).lower(), *version), history_cache_control(to_date)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, cache_control)
+    try:
+        data = indicator_engine.compute(symbol, timespan, name_list, from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse(
+        {"symbol": symbol, "timespan": timespan, "from": from_date, "to": to_date, **data},
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+@router.get("/stock/history/export", tags=["Stock History"])
+def export_historical_prices(
+    symbols: str = Query(..., description="Comma-separated symbols, e.g. AAPL,MSFT,NVDA"),
+    timespan: str = Query("day", enum=["minute", "hour", "day", "week", "month", "quarter", "year"]),
+    from_date: str = Query("2024-01-01"),
+    to_date: str = Query("2025-07-10"),
+    format: str = Query("csv", enum=["csv", "parquet"])
+):
+    """
+    Stream OHLCV bars for many symbols as a single CSV or Parquet file.
+    Bars are written as each symbol's pages arrive, with bounded fetch concurrency and constant memory.
+    If a symbol's fetch fails mid-stream, the transfer is aborted, so a failed export never looks complete.
+    Args:
+        symbols (str): Comma-separated stock ticker symbols.
+        timespan (str): The time granularity.
+        from_date (str): Start date (YYYY-MM-DD).
+        to_date (str): End date (YYYY-MM-DD).
+        format (str): 'csv' or 'parquet'.
+    Returns:
+        StreamingResponse: The export file, with columns symbol, t, o, h, l, c, v, vw, n.
+    Raises:
+        HTTPException: If the symbol list is empty or too long, or Parquet export is unavailable.
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not symbol_list or len(symbol_list) > MAX_EXPORT_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {MAX_EXPORT_SYMBOLS} symbols")
+    try:
+        chunks = export_history(symbol_list, timespan, from_date, to_date, format)
+    except ValueError as e:
+        raise HTTPException(status_code=501 if format == "parquet" else 400, detail=str(e))
+    media_type = "text/csv" if format == "csv" else "application/vnd.apache.parquet"
+    filename = f"history_{timespan}_{from_date}_{to_date}.{format}"
+    return StreamingResponse(chunks, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
@@ -3,35 +3,122 @@ news.py (routers)
 
 This module defines the API route for fetching company news from Finnhub in the FastAPI application.
 
-- /news/{symbol} (GET): Fetch news articles for a given stock symbol.
+- /news/global (GET): Fetch a merged feed of cached news across all watched symbols, with cursor paging.
+- /news/search (GET): Full-text search over cached news articles, ranked with BM25.
+- /news/{symbol} (GET): Fetch cached, incrementally refreshed news articles for a given stock symbol, with cursor paging.
 """
 #------------------------------------------------------------------------
-from fastapi import APIRouter, HTTPException
-from app.core.news_data import get_news_for_symbol
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.news_store import news_store, decode_cursor, global_feed_symbols
+from app.core.news_search import news_index
+from app.core.responses import FastJSONResponse
 #------------------------------------------------------------------------
 
 router = APIRouter()
+
+#------------------------------------------------------------------------
+def get_db():
+    """
+    Dependency that provides a SQLAlchemy database session.
+    Yields:
+        Session: SQLAlchemy session object.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 #------------------------------------------------------------------------
-@router.get("/news/{symbol}", tags=["News"])
-def news(symbol: str):
+@router.get("/news/global", response_class=FastJSONResponse, tags=["News"])
+def global_news(
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Cursor from a previous page's next_before."),
+    db: Session = Depends(get_db)
+):
     """
-    Fetch news articles for a given stock symbol.
+    Fetch a global news feed merged from the cached news of every watched symbol (plus GLOBAL_NEWS_SYMBOLS).
+    Served purely from cache; the symbols are kept refreshed by the background news refresher.
     Args:
-        symbol (str): The stock ticker symbol.
+        limit (int): Maximum number of articles to return.
+        before (str, optional): Paging cursor; only articles older than it are returned.
+        db (Session): Database session (injected).
+    Returns:
+        dict: Page of news articles, the cursor for the next page, and the number of merged symbols.
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    symbols = global_feed_symbols(db)
+    try:
+        articles, next_before = news_store.merged_page(symbols, limit, before)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'before' cursor")
+    return FastJSONResponse({"news": articles, "next_before": next_before, "symbols": len(symbols)})
+
+#------------------------------------------------------------------------
+@router.get("/news/search", response_class=FastJSONResponse, tags=["News"])
+def search_news(
+    q: str = Query(..., min_length=1, max_length=200),
+    symbols: Optional[str] = Query(None, description="Comma-separated symbols to filter by."),
+    from_date: Optional[str] = Query(None, description="Earliest publish date (YYYY-MM-DD)."),
+    to_date: Optional[str] = Query(None, description="Latest publish date (YYYY-MM-DD)."),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Search headlines, summaries, sources and related symbols of cached news articles.
+    Answered from the in-memory index only; Finnhub is never called.
+    Args:
+        q (str): Free-text query, e.g. 'earnings' or 'fda approval'.
+        symbols (str, optional): Comma-separated symbols; only articles related to one of them are returned.
+        from_date (str, optional): Earliest publish date (YYYY-MM-DD, inclusive).
+        to_date (str, optional): Latest publish date (YYYY-MM-DD, inclusive).
+        limit (int): Maximum number of results.
     Returns:
-        list: News articles from Finnhub.
+        dict: Query, number of indexed articles, and ranked matching articles.
     Raises:
-        HTTPException: If the news fetch fails.
+        HTTPException: If a date is malformed.
     """
     try:
-        data = get_news_for_symbol(symbol)
-        return data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        from_ts = int(datetime.strptime(from_date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()) if from_date else None
+        to_ts = int(datetime.strptime(to_date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()) + 86399 if to_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else None
+    results = news_index.search(q, symbols=symbol_list, from_ts=from_ts, to_ts=to_ts, limit=limit)
+    return FastJSONResponse({"query": q, "indexed": len(news_index), "results": results})
 
-@router.get("/news/global", tags=["News"])
-def global_news():
+#------------------------------------------------------------------------
+@router.get("/news/{symbol}", response_class=FastJSONResponse, tags=["News"])
+def news(
+    symbol: str,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Cursor from a previous page's next_before.")
+):
     """
-    Fetch global news (placeholder: returns empty list or static message).
+    Fetch news articles for a given stock symbol, newest first.
+    The symbol's cache is refreshed with only the articles published since the last refresh.
+    Args:
+        symbol (str): The stock ticker symbol.
+        limit (int): Maximum number of articles to return.
+        before (str, optional): Paging cursor; only articles older than it are returned.
+    Returns:
+        dict: Symbol, page of news articles, and the cursor for the next page.
+    Raises:
+        HTTPException: If the cursor is malformed or the news fetch fails.
     """
-    return {"news": [], "message": "Global news not implemented yet."} 
\ No newline at end of file
+    if before is not None:
+        try:
+            decode_cursor(before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid 'before' cursor")
+    else:
+        try:
+            news_store.refresh(symbol)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    articles, next_before = news_store.page(symbol, limit, before)
+    return FastJSONResponse({"symbol": symbol.upper(), "news": articles, "next_before": next_before})
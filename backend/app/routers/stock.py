@@ -1,20 +1,42 @@
 """
 stock.py (routers)
 
-This module defines the API routes for fetching stock summary data and chart URLs from Yahoo Finance in the FastAPI application.
+This module defines the API routes for fetching stock summary data and chart images in the FastAPI application.
 
+- /stock/search (GET): Search tickers by symbol or company name (autocomplete).
 - /stock/{symbol} (GET): Fetch stock summary data.
-- /stock/{symbol}/chart (GET): Fetch a Yahoo Finance chart URL for the stock.
+- /stock/{symbol}/chart (GET): Render a cached SVG sparkline or candlestick chart from historical bars.
 """
-from fastapi import APIRouter, HTTPException
-from app.core.stock_data import get_stock_summary, get_stock_chart_image
+from fastapi import APIRouter, HTTPException, Query, Response
+from app.core.stock_data import get_stock_summary
+from app.core.charts import CHART_PERIODS, CHART_INTERVALS, get_chart
+from app.core.ticker_index import get_ticker_index
 #------------------------------------------------------------------------
 
 router = APIRouter()
 
+#------------------------------------------------------------------------
+# Declared before /stock/{symbol} so "search" is not captured as a symbol.
+@router.get("/stock/search", tags=["Stock"])
+def stock_search(q: str = Query(..., min_length=1, max_length=64), limit: int = Query(10, ge=1, le=50)):
+    """
+    Search tickers by symbol or company name, served from the in-memory ticker index.
+    Args:
+        q (str): Search text (symbol or company name prefix, typos tolerated).
+        limit (int): Maximum number of results.
+    Returns:
+        dict: Query and ranked list of matching tickers.
+    Raises:
+        HTTPException: If the ticker index has not been built yet.
+    """
+    index = get_ticker_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Ticker index is still loading, try again shortly.")
+    return {"query": q, "results": index.search(q, limit)}
+
 #------------------------------------------------------------------------
 @router.get("/stock/{symbol}", tags=["Stock"])
-def stock_summary(symbol: str):
+def stock_summary(symbol: str, response: Response):
     """
     Fetch summary data for a given stock symbol.
     Args:
@@ -26,6 +48,8 @@ def stock_summary(symbol: str):
     """
     try:
         data = get_stock_summary(symbol)
+        # Reference data changes rarely; let browsers and proxies reuse it for a few minutes.
+        response.headers["Cache-Control"] = "public, max-age=300"
         return data
     except ValueError as e:
         raise HTTPException(status_code=502, detail=str(e))
@@ -34,13 +58,34 @@ def stock_summary(symbol: str):
     
 #------------------------------------------------------------------------
 @router.get("/stock/{symbol}/chart", tags=["Stock"])
-def stock_chart(symbol: str):
+def stock_chart(
+    symbol: str,
+    period: str = Query("1mo", enum=list(CHART_PERIODS)),
+    interval: str = Query("1d", enum=list(CHART_INTERVALS)),
+    style: str = Query("line", enum=["line", "candle"]),
+    width: int = Query(120, ge=16, le=1200),
+    height: int = Query(32, ge=8, le=600)
+):
     """
-    Fetch a Yahoo Finance chart URL for a given stock symbol.
+    Render a compact SVG chart of a stock from our own historical bars.
+    Charts are served from a content-addressed cache; the ETag is the content digest.
     Args:
         symbol (str): The stock ticker symbol.
+        period (str): Range of the chart, ending today.
+        interval (str): Bar size.
+        style (str): 'line' sparkline or 'candle' candlesticks.
+        width (int): Width in pixels.
+        height (int): Height in pixels.
     Returns:
-        dict: Chart URL for embedding in the frontend.
+        Response: SVG image.
+    Raises:
+        HTTPException: If the period/interval combination is not supported or no bars are available.
     """
-    url = get_stock_chart_image(symbol)
-    return {"chart_url": url}
+    try:
+        digest, svg = get_chart(symbol, period, interval, style, width, height)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=svg, media_type="image/svg+xml",
+                    headers={"ETag": f'"{digest}"', "Cache-Control": "public, max-age=60"})
@@ -0,0 +1,123 @@
+"""
+stream.py (routers)
+
+This module defines the live price streaming endpoints in the FastAPI application.
+
+- /stream/ws (WebSocket): Subscribe and unsubscribe to symbols and receive batched price updates.
+- /stream/sse (GET): Server-Sent Events stream of price updates for a fixed set of symbols.
+- /stream/stats (GET): Number of subscriptions per streamed symbol.
+
+All clients share one upstream feed per symbol through the price hub; slow clients receive conflated updates.
+"""
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.core.price_stream import price_hub, Subscription
+#------------------------------------------------------------------------
+
+router = APIRouter()
+
+MAX_STREAM_SYMBOLS = 50
+SSE_HEARTBEAT_SECONDS = 15
+
+#------------------------------------------------------------------------
+def _split_errors(batch: list) -> tuple:
+    # Feed failures arrive in the mailbox as updates carrying an 'error' field.
+    prices = [u for u in batch if "error" not in u]
+    errors = [u for u in batch if "error" in u]
+    return prices, errors
+
+#------------------------------------------------------------------------
+@router.websocket("/stream/ws")
+async def stream_ws(websocket: WebSocket):
+    """
+    WebSocket price stream.
+    Clients send {"action": "subscribe" | "unsubscribe", "symbols": [...]} and receive
+    {"type": "prices", "data": [...]} messages holding the latest update of every symbol that changed.
+    If a symbol's feed fails, the client receives {"type": "error", "symbol": ..., "detail": ...} and is
+    unsubscribed from it.
+    """
+    await websocket.accept()
+    subscription = Subscription()
+
+    async def send_updates():
+        while True:
+            prices, errors = _split_errors(await subscription.get())
+            for error in errors:
+                await websocket.send_json({"type": "error", "symbol": error["symbol"], "detail": error["error"]})
+            if prices:
+                await websocket.send_json({"type": "prices", "data": prices})
+
+    sender = asyncio.create_task(send_updates())
+    try:
+        while True:
+            message = await websocket.receive_json()
+            if not isinstance(message, dict) or not isinstance(message.get("symbols", []), list):
+                await websocket.send_json({"type": "error", "detail": 'Expected {"action": ..., "symbols": [...]}'})
+                continue
+            action = message.get("action")
+            symbols = [str(s) for s in message.get("symbols", [])]
+            if action == "subscribe":
+                if len(subscription.symbols | {s.upper() for s in symbols}) > MAX_STREAM_SYMBOLS:
+                    await websocket.send_json({"type": "error", "detail": f"At most {MAX_STREAM_SYMBOLS} symbols per connection"})
+                    continue
+                price_hub.subscribe(subscription, symbols)
+            elif action == "unsubscribe":
+                price_hub.unsubscribe(subscription, symbols)
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown action: {action}"})
+                continue
+            await websocket.send_json({"type": "subscribed", "symbols": sorted(subscription.symbols)})
+    except (WebSocketDisconnect, ValueError):
+        pass
+    finally:
+        sender.cancel()
+        price_hub.unsubscribe(subscription)
+
+#------------------------------------------------------------------------
+@router.get("/stream/sse", tags=["Stream"])
+async def stream_sse(symbols: str = Query(..., description="Comma-separated symbols, e.g. AAPL,MSFT")):
+    """
+    Server-Sent Events price stream for a set of symbols.
+    Args:
+        symbols (str): Comma-separated stock symbols.
+    Returns:
+        StreamingResponse: text/event-stream of "prices" events, "error" events for failed feeds,
+                           and periodic heartbeat comments.
+    Raises:
+        HTTPException: If no symbols or too many symbols are requested.
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not symbol_list or len(symbol_list) > MAX_STREAM_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {MAX_STREAM_SYMBOLS} symbols")
+
+    async def events():
+        subscription = Subscription()
+        price_hub.subscribe(subscription, symbol_list)
+        try:
+            while True:
+                try:
+                    batch = await asyncio.wait_for(subscription.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                prices, errors = _split_errors(batch)
+                for error in errors:
+                    yield f"event: error\ndata: {json.dumps({'symbol': error['symbol'], 'detail': error['error']})}\n\n"
+                if prices:
+                    yield f"event: prices\ndata: {json.dumps(prices)}\n\n"
+        finally:
+            price_hub.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+#------------------------------------------------------------------------
+@router.get("/stream/stats", tags=["Stream"])
+async def stream_stats():
+    """
+    Report how many subscriptions share each symbol's upstream feed.
+    Returns:
+        dict: Symbol -> number of subscriptions.
+    """
+    return {"symbols": price_hub.stats()}
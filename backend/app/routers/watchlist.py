@@ -6,14 +6,22 @@ This module defines the API routes for managing user watchlists in the FastAPI a
 - /watchlist (GET): Retrieve the current user's watchlist.
 - /watchlist (POST): Add a stock to the user's watchlist.
 - /watchlist/{stock_symbol} (DELETE): Remove a stock from the user's watchlist.
+- /watchlist/analytics (GET): Correlation, covariance, beta and portfolio risk for the user's watchlist.
+- /watchlist/charts (GET): One SVG sprite with a chart per watchlist symbol.
 
 Note: USER_ID is currently hardcoded for demonstration; replace with JWT user extraction in production.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
-from app.core.crud_watchlist import get_watchlist, add_to_watchlist, remove_from_watchlist
+from app.core.crud_watchlist import get_watchlist, add_to_watchlist, remove_from_watchlist, get_watchlist_version
+from app.core.http_cache import etag_matches, not_modified
+from app.core.responses import FastJSONResponse
 from app.schemas.watchlist import WatchlistCreate, WatchlistRead
+from app.core.analytics import load_bars, portfolio_analytics
+from app.core.alert_engine import alert_engine
+from app.core.charts import CHART_PERIODS, CHART_INTERVALS, get_chart_sprite
 from app.routers.user import get_current_user
 #------------------------------------------------------------------------
 
@@ -38,15 +46,22 @@ USER_ID = 1
 
 #------------------------------------------------------------------------
 @router.get("/watchlist", response_model=list[WatchlistRead], tags=["Watchlist"])
-def read_watchlist(current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+def read_watchlist(request: Request, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Retrieve the current user's watchlist.
+    The ETag is derived from the watchlist's version, so an unchanged watchlist is answered with 304 before loading it.
+    Rows come straight from the database, so they are serialized directly instead of being re-validated
+    through WatchlistRead one by one; response_model only documents the shape.
     Args:
         db (Session): Database session (injected).
     Returns:
         list[WatchlistRead]: List of watchlist entries.
     """
-    return get_watchlist(db, user_id=current_user.id)
+    etag = f'W/"wl-{current_user.id}-{get_watchlist_version(db, current_user.id)}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    rows = [{"id": w.id, "stock_symbol": w.stock_symbol} for w in get_watchlist(db, user_id=current_user.id)]
+    return FastJSONResponse(rows, headers={"ETag": etag})
 
 
 #------------------------------------------------------------------------
@@ -73,6 +88,77 @@ def remove_stock_from_watchlist(stock_symbol: str, current_user = Depends(get_cu
     Raises:
         HTTPException: If the stock is not found in the watchlist.
     """
-    removed = remove_from_watchlist(db, user_id=current_user.id, stock_symbol=stock_symbol)
+    removed, deleted_rule_ids = remove_from_watchlist(db, user_id=current_user.id, stock_symbol=stock_symbol)
     if not removed:
-        raise HTTPException(status_code=404, detail="Stock not found in watchlist") 
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="Stock not found in watchlist")
+    for rule_id in deleted_rule_ids:
+        alert_engine.remove(rule_id)
+
+#------------------------------------------------------------------------
+@router.get("/watchlist/analytics", tags=["Watchlist"])
+def watchlist_analytics(
+    from_date: str = Query("2024-01-01"),
+    to_date: str = Query("2025-07-10"),
+    benchmark: str = Query("SPY"),
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Analyze how the symbols on the user's watchlist move together, using daily bars aligned on a common calendar.
+    Args:
+        from_date (str): Start date (YYYY-MM-DD).
+        to_date (str): End date (YYYY-MM-DD).
+        benchmark (str): Symbol betas are computed against.
+        db (Session): Database session (injected).
+    Returns:
+        dict: Correlation and annualized covariance matrices, per-symbol volatility and beta,
+              equal-weight portfolio volatility and drawdown, and symbols whose data could not be fetched.
+    Raises:
+        HTTPException: If the watchlist is empty.
+    """
+    symbols = list(dict.fromkeys(w.stock_symbol.upper() for w in get_watchlist(db, user_id=current_user.id)))
+    if not symbols:
+        raise HTTPException(status_code=404, detail="Watchlist is empty")
+    benchmark = benchmark.upper()
+    bars, errors = load_bars(list(dict.fromkeys(symbols + [benchmark])), "day", from_date, to_date)
+    # The benchmark is part of the portfolio only if the user watches it.
+    result = portfolio_analytics({s: b for s, b in bars.items() if b}, benchmark, portfolio_symbols=symbols)
+    return {"from": from_date, "to": to_date, **result, "errors": errors}
+
+#------------------------------------------------------------------------
+@router.get("/watchlist/charts", tags=["Watchlist"])
+def watchlist_charts(
+    period: str = Query("1mo", enum=list(CHART_PERIODS)),
+    interval: str = Query("1d", enum=list(CHART_INTERVALS)),
+    style: str = Query("line", enum=["line", "candle"]),
+    width: int = Query(120, ge=16, le=1200),
+    height: int = Query(32, ge=8, le=600),
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Render the charts of every watchlist symbol as a single SVG sprite.
+    Each chart is a <symbol id="chart-{SYMBOL}">, drawn with <svg><use href="#chart-AAPL"/></svg>, so a whole
+    watchlist loads with one small request. Symbols without data are listed in the X-Missing-Symbols header,
+    comma-separated and each percent-encoded (UTF-8) so any symbol fits in a header.
+    Args:
+        period (str): Range of the charts, ending today.
+        interval (str): Bar size.
+        style (str): 'line' sparkline or 'candle' candlesticks.
+        width (int): Width of each chart in pixels.
+        height (int): Height of each chart in pixels.
+        db (Session): Database session (injected).
+    Returns:
+        Response: SVG sprite.
+    Raises:
+        HTTPException: If the period/interval combination is not supported.
+    """
+    symbols = [w.stock_symbol for w in get_watchlist(db, user_id=current_user.id)]
+    try:
+        digest, sprite, missing = get_chart_sprite(symbols, period, interval, style, width, height)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": f'"{digest}"', "Cache-Control": "private, max-age=60"}
+    if missing:
+        headers["X-Missing-Symbols"] = ",".join(quote(s, safe="") for s in missing)
+    return Response(content=sprite, media_type="image/svg+xml", headers=headers)
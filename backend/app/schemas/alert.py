@@ -0,0 +1,93 @@
+"""
+alert.py (schemas)
+
+This module defines Pydantic schemas for price alert rules and the alert inbox in the FastAPI application.
+
+- AlertRuleCreate: Schema for attaching an alert rule to a watchlist symbol.
+- AlertRuleRead: Schema for reading an alert rule.
+- AlertEventRead: Schema for reading a fired alert from the inbox.
+"""
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, validator
+#------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------
+class AlertRuleCreate(BaseModel):
+    """
+    Schema for creating an alert rule.
+
+    Attributes:
+        stock_symbol (str): Symbol on the user's watchlist to watch.
+        kind (str): 'above' / 'below' (threshold is a price) or 'pct_up' / 'pct_down' (threshold is a percent move).
+        threshold (float): Price level or percent move.
+        reference_price (float, optional): Price percent moves are measured from; defaults to the latest price.
+    """
+    stock_symbol: str
+    kind: Literal["above", "below", "pct_up", "pct_down"]
+    threshold: float = Field(..., gt=0)
+    reference_price: Optional[float] = Field(None, gt=0)
+
+    @validator("threshold")
+    def threshold_reachable(cls, threshold, values):
+        # A fall of 100% or more puts the level at or below zero, where no trade can reach it.
+        if values.get("kind") == "pct_down" and threshold >= 100:
+            raise ValueError("pct_down threshold must be below 100")
+        return threshold
+
+#------------------------------------------------------------------------
+class AlertRuleRead(BaseModel):
+    """
+    Schema for reading an alert rule.
+
+    Attributes:
+        id (int): Unique ID of the rule.
+        watchlist_id (int): Watchlist entry the rule is attached to.
+        stock_symbol (str): Watched symbol.
+        kind (str): Rule kind.
+        threshold (float): Price level or percent move.
+        reference_price (float, optional): Price percent moves are measured from.
+        level (float): Absolute price that triggers the rule.
+        active (bool): False once the rule has fired.
+        created_at (datetime): Creation time (UTC).
+    """
+    id: int
+    watchlist_id: int
+    stock_symbol: str
+    kind: str
+    threshold: float
+    reference_price: Optional[float]
+    level: float
+    active: bool
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+#------------------------------------------------------------------------
+class AlertEventRead(BaseModel):
+    """
+    Schema for reading a fired alert.
+
+    Attributes:
+        id (int): Unique ID of the event.
+        rule_id (int): Rule that fired.
+        stock_symbol (str): Symbol that triggered the alert.
+        kind (str): Kind of the rule that fired.
+        level (float): Trigger level of the rule.
+        price (float): Price that triggered the rule.
+        triggered_at (datetime): Time the alert fired (UTC).
+        read (bool): Whether the alert has been marked as read.
+    """
+    id: int
+    rule_id: int
+    stock_symbol: str
+    kind: str
+    level: float
+    price: float
+    triggered_at: datetime
+    read: bool
+
+    class Config:
+        orm_mode = True
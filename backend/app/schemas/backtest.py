@@ -0,0 +1,70 @@
+"""
+backtest.py (schemas)
+
+This module defines Pydantic schemas for backtest and parameter sweep requests in the FastAPI application.
+
+- StrategySpec: Strategy type and parameters (crossover or threshold rule).
+- BacktestRequest: Symbol, bar range and strategy for a single backtest run.
+- SweepRequest: A backtest request plus a parameter grid to sweep.
+"""
+from typing import Dict, List, Literal, Union
+from pydantic import BaseModel, Field
+#------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------
+class StrategySpec(BaseModel):
+    """
+    Schema for a strategy specification.
+
+    Attributes:
+        type (str): 'sma_crossover', 'ema_crossover' or 'threshold'.
+        fast (int): Fast moving-average period (crossovers).
+        slow (int): Slow moving-average period (crossovers).
+        indicator (str): Indicator name the threshold rule watches, e.g. 'rsi_14'.
+        lower (float): Enter long when the indicator drops below this level (threshold).
+        upper (float): Exit (or go short) when the indicator rises above this level (threshold).
+        allow_short (bool): Go short instead of flat when the rule is bearish.
+        fee_bps (float): Trading cost in basis points per unit of position change.
+    """
+    type: Literal["sma_crossover", "ema_crossover", "threshold"]
+    fast: int = Field(10, ge=1, le=500)
+    slow: int = Field(50, ge=2, le=500)
+    indicator: str = "rsi_14"
+    lower: float = 30.0
+    upper: float = 70.0
+    allow_short: bool = False
+    fee_bps: float = Field(0.0, ge=0.0, le=1000.0)
+
+#------------------------------------------------------------------------
+class BacktestRequest(BaseModel):
+    """
+    Schema for a single backtest run.
+
+    Attributes:
+        symbol (str): The stock ticker symbol.
+        timespan (str): Bar granularity (minute, hour, day, week, month, quarter, year).
+        from_date (str): Start date (YYYY-MM-DD).
+        to_date (str): End date (YYYY-MM-DD).
+        strategy (StrategySpec): Strategy to run.
+    """
+    symbol: str
+    timespan: Literal["minute", "hour", "day", "week", "month", "quarter", "year"] = "day"
+    from_date: str = "2024-01-01"
+    to_date: str = "2025-07-10"
+    strategy: StrategySpec
+
+#------------------------------------------------------------------------
+class SweepRequest(BacktestRequest):
+    """
+    Schema for a parameter sweep: the strategy is the base spec, and every combination of grid values is run.
+
+    Attributes:
+        grid (dict[str, list]): Strategy field -> values to try, e.g. {"fast": [5, 10], "slow": [50, 100]}
+            or {"indicator": ["rsi_7", "rsi_14"], "lower": [20, 30]}.
+        sort_by (str): Statistic the results are ranked by (descending).
+        top (int): Number of best results to return.
+    """
+    grid: Dict[str, List[Union[float, str, bool]]]
+    sort_by: Literal["sharpe", "total_return", "annualized_return", "max_drawdown"] = "sharpe"
+    top: int = Field(20, ge=1, le=1000)
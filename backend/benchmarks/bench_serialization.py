@@ -0,0 +1,87 @@
+"""
+bench_serialization.py
+
+Microbenchmark of JSON response serialization for the data-heavy endpoints.
+
+For each endpoint a payload shaped like its real response is serialized two ways:
+- default: FastAPI's regular path (response_model validation where the route declares one, `jsonable_encoder`,
+  then JSONResponse rendering).
+- fast: FastJSONResponse rendering of the payload as returned by the route.
+Throughput is reported in MB of response body per second, together with the speedup.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization [--scale 1.0] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.responses import FastJSONResponse, orjson
+from app.schemas.watchlist import WatchlistRead
+#------------------------------------------------------------------------
+
+
+def _bars(n: int) -> list:
+    t, price, bars = 1_700_000_000_000, 100.0, []
+    for i in range(n):
+        o = price
+        price *= 1 + random.gauss(0, 0.01)
+        bars.append({"v": random.randint(1_000, 5_000_000) * 1.0, "vw": round((o + price) / 2, 4), "o": round(o, 4),
+                     "c": round(price, 4), "h": round(max(o, price) * 1.005, 4), "l": round(min(o, price) * 0.995, 4),
+                     "t": t + i * 60_000, "n": random.randint(1, 5_000)})
+    return bars
+
+def _articles(n: int) -> list:
+    words = "earnings guidance revenue upgrade downgrade merger lawsuit dividend buyback outlook".split()
+    return [{"category": "company", "datetime": 1_720_000_000 - i * 600, "headline": " ".join(random.choices(words, k=10)),
+             "id": 130_000_000 + i, "image": f"https://example.com/img/{i}.jpg", "related": "AAPL",
+             "source": "Example News", "summary": " ".join(random.choices(words, k=60)),
+             "url": f"https://example.com/news/{i}"} for i in range(n)]
+
+def _payloads(scale: float) -> dict:
+    # Sizes match the largest responses each route produces.
+    n = lambda count: max(1, int(count * scale))
+    return {
+        "historical_prices": ({"symbol": "AAPL", "timespan": "minute", "from": "2024-01-01", "to": "2024-03-01",
+                               "prices": _bars(n(5_000))}, None),
+        "news": ({"symbol": "AAPL", "news": _articles(n(200)), "next_before": "1720000000:130000199"}, None),
+        "list_users": ([{"id": i, "email": f"user{i}@example.com"} for i in range(n(10_000))], None),
+        "read_watchlist": ([{"id": i, "stock_symbol": f"SYM{i}"} for i in range(n(500))], WatchlistRead),
+    }
+
+#------------------------------------------------------------------------
+def _default(payload, model):
+    if model is not None:
+        payload = [model(**row) for row in payload]
+    return JSONResponse(jsonable_encoder(payload)).body
+
+def _fast(payload, model):
+    return FastJSONResponse(payload).body
+
+def _throughput(serialize, payload, model, repeat: int) -> tuple:
+    body = serialize(payload, model)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(payload, model)
+        best = min(best, time.perf_counter() - start)
+    return len(body), best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply payload sizes by this factor.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement (best is reported).")
+    args = parser.parse_args()
+    random.seed(0)
+    if orjson is None:
+        print("orjson is not installed: the fast path falls back to the standard encoder.\n")
+    print(f"{'endpoint':<18}{'bytes':>12}{'default MB/s':>15}{'fast MB/s':>12}{'speedup':>10}")
+    for endpoint, (payload, model) in _payloads(args.scale).items():
+        size, default_s = _throughput(_default, payload, model, args.repeat)
+        _, fast_s = _throughput(_fast, payload, model, args.repeat)
+        print(f"{endpoint:<18}{size:>12,}{size / default_s / 1e6:>15.1f}{size / fast_s / 1e6:>12.1f}"
+              f"{default_s / fast_s:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
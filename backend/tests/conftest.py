@@ -0,0 +1,7 @@
+import os
+
+# app.core.database creates its engine at import time. Tests never connect, but the URL must parse
+# even without a .env file.
+for name, default in (("POSTGRES_USER", "test"), ("POSTGRES_PASSWORD", "test"), ("POSTGRES_DB", "test"),
+                      ("POSTGRES_HOST", "localhost"), ("POSTGRES_PORT", "5432")):
+    os.environ.setdefault(name, default)
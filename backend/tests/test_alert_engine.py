@@ -0,0 +1,49 @@
+import pytest
+from app.core.alert_engine import AlertEngine
+from app.schemas.alert import AlertRuleCreate
+
+
+def make_engine():
+    engine = AlertEngine()
+    engine.add(1, "aapl", "above", 110.0)
+    engine.add(2, "AAPL", "pct_up", 120.0)
+    engine.add(3, "AAPL", "below", 90.0)
+    engine.add(4, "AAPL", "pct_down", 80.0)
+    engine.add(5, "MSFT", "above", 300.0)
+    return engine
+
+
+def test_rules_fire_when_price_crosses_their_level():
+    engine = make_engine()
+    assert engine.evaluate("AAPL", 100.0) == []
+    assert engine.evaluate("AAPL", 110.0) == [1]
+    assert sorted(engine.evaluate("AAPL", 125.0)) == [2]
+    assert sorted(engine.evaluate("aapl", 79.0)) == [3, 4]
+    assert engine.symbols() == {"MSFT"}
+
+
+def test_rules_fire_once():
+    engine = make_engine()
+    assert sorted(engine.evaluate("AAPL", 150.0)) == [1, 2]
+    assert engine.evaluate("AAPL", 150.0) == []
+    assert engine.evaluate("MSFT", 299.0) == []
+    assert engine.evaluate("MSFT", 301.0) == [5]
+    assert engine.evaluate("MSFT", 301.0) == []
+
+
+def test_removed_rules_do_not_fire():
+    engine = make_engine()
+    assert engine.remove(1)
+    assert not engine.remove(1)
+    assert engine.evaluate("AAPL", 115.0) == []
+    assert engine.remove(5)
+    assert engine.symbols() == {"AAPL"}
+    engine.load([])
+    assert engine.symbols() == set()
+
+
+def test_pct_down_threshold_must_stay_reachable():
+    with pytest.raises(ValueError):
+        AlertRuleCreate(stock_symbol="AAPL", kind="pct_down", threshold=100)
+    assert AlertRuleCreate(stock_symbol="AAPL", kind="pct_up", threshold=150).threshold == 150
+    assert AlertRuleCreate(stock_symbol="AAPL", kind="pct_down", threshold=50).threshold == 50
@@ -0,0 +1,30 @@
+import numpy as np
+from app.core.analytics import portfolio_analytics
+
+
+def make_bars(seed, n=60):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return [{"t": i * 86_400_000, "c": float(c)} for i, c in enumerate(closes)]
+
+
+BARS = {"AAPL": make_bars(1), "MSFT": make_bars(2), "SPY": make_bars(3)}
+
+
+def test_benchmark_excluded_by_default():
+    result = portfolio_analytics(BARS, "SPY")
+    assert result["symbols"] == ["AAPL", "MSFT"]
+    assert result["benchmark"] == "SPY"
+    assert set(result["beta"]) == {"AAPL", "MSFT"}
+    assert len(result["correlation"]) == 2
+
+
+def test_watched_benchmark_stays_in_portfolio():
+    result = portfolio_analytics(BARS, "SPY", portfolio_symbols=["AAPL", "MSFT", "SPY"])
+    assert result["symbols"] == ["AAPL", "MSFT", "SPY"]
+    assert set(result["volatility"]) == {"AAPL", "MSFT", "SPY"}
+    assert len(result["covariance"]) == 3
+    assert result["beta"]["SPY"] == 1.0
+
+    without = portfolio_analytics(BARS, "SPY", portfolio_symbols=["AAPL", "MSFT"])
+    assert without["portfolio"]["total_return"] != result["portfolio"]["total_return"]
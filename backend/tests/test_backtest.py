@@ -0,0 +1,32 @@
+"""
+Tests for the vectorized backtesting engine and parameter sweeps.
+"""
+import numpy as np
+import pytest
+from app.core import backtest
+from app.core.backtest import run_sweep, shutdown_sweep_pool
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(7)
+    return 100 * np.cumprod(1 + rng.normal(0, 0.01, 600))
+
+
+def test_pooled_sweep_matches_inline_sweep(closes):
+    specs = [{"type": "sma_crossover", "fast": f, "slow": s} for f in (5, 10) for s in (20, 50)]
+    specs += [{"type": "threshold", "indicator": name, "lower": 30, "upper": 70} for name in ("rsi_7", "rsi_14")]
+    try:
+        pooled = run_sweep(closes, specs, workers=2)
+        assert backtest._pool is not None
+        assert run_sweep(closes, specs, workers=2) == pooled
+    finally:
+        shutdown_sweep_pool()
+    assert backtest._pool is None
+    assert pooled == run_sweep(closes, specs, workers=1)
+    assert [r["params"] for r in pooled] == specs
+
+
+def test_invalid_spec_is_reported_per_result(closes):
+    results = run_sweep(closes, [{"type": "sma_crossover", "fast": 50, "slow": 10}], workers=1)
+    assert "error" in results[0]
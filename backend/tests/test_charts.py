@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from app.core.charts import _last_session, chart_cache, get_chart_sprite
+import app.core.charts as charts
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def minute_bars(day):
+    # 04:00-20:00 ET; in January 19:00-20:00 ET falls after midnight UTC.
+    start = datetime(2025, 1, day, 4, tzinfo=NEW_YORK)
+    return [{"t": int((start + timedelta(minutes=i)).timestamp() * 1000), "c": 100.0 + i % 7}
+            for i in range(16 * 60)]
+
+
+def test_last_session_groups_by_new_york_date():
+    session = _last_session(minute_bars(8) + minute_bars(9))
+    assert len(session) == 16 * 60
+    assert session == minute_bars(9)
+
+
+def test_chart_cache_key_sees_revised_last_bar_volume(monkeypatch):
+    bars = [{"t": 0, "o": 1, "h": 2, "l": 1, "c": 2, "v": 100},
+            {"t": 86_400_000, "o": 2, "h": 3, "l": 2, "c": 3, "v": 100}]
+    monkeypatch.setattr(charts, "load_bars", lambda symbols, *args: ({s: list(bars) for s in symbols}, {}))
+    seen = []
+    monkeypatch.setattr(chart_cache, "get_or_render", lambda key, render: seen.append(key) or ("d", render()))
+    get_chart_sprite(["AAPL"])
+    bars[-1] = {**bars[-1], "v": 5000}
+    get_chart_sprite(["AAPL"])
+    assert seen[0] != seen[1]
@@ -0,0 +1,29 @@
+"""
+Tests for streaming bulk history exports.
+"""
+import pytest
+from app.core import history_export
+from app.core.history_export import ExportError, export_history
+
+
+def fake_pages(failing: set):
+    def pages(symbol, timespan, from_date, to_date):
+        yield [{"t": 1, "o": 1.0, "h": 1.0, "l": 1.0, "c": 1.0, "v": 10.0, "vw": 1.0, "n": 1}]
+        if symbol in failing:
+            raise Exception("Polygon API error: 429")
+        yield [{"t": 2, "o": 2.0, "h": 2.0, "l": 2.0, "c": 2.0, "v": 20.0, "vw": 2.0, "n": 2}]
+    return pages
+
+
+def test_export_writes_every_page(monkeypatch):
+    monkeypatch.setattr(history_export, "iter_historical_pages", fake_pages(set()))
+    body = b"".join(export_history(["AAA", "BBB"], "day", "2024-01-01", "2024-01-31")).decode()
+    lines = body.strip().splitlines()
+    assert lines[0] == ",".join(history_export.EXPORT_COLUMNS)
+    assert len(lines) == 1 + 4
+
+
+def test_export_aborts_when_a_symbol_fails(monkeypatch):
+    monkeypatch.setattr(history_export, "iter_historical_pages", fake_pages({"BBB"}))
+    with pytest.raises(ExportError, match="BBB"):
+        b"".join(export_history(["AAA", "BBB"], "day", "2024-01-01", "2024-01-31"))
@@ -0,0 +1,72 @@
+"""
+Tests for ETag validation and the conditional GET middleware.
+"""
+import asyncio
+from app.core.http_cache import ConditionalGetMiddleware, etag_matches, version_etag
+
+
+def json_app(body: bytes, headers: list = ()):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json"), *headers]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def call(app, if_none_match: str = None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(ConditionalGetMiddleware(app)(scope, receive, send))
+    start = messages[0]
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def test_body_hash_etag_is_weak_and_revalidates():
+    status, headers, body = call(json_app(b'{"a": 1}'))
+    assert status == 200 and body == b'{"a": 1}'
+    assert headers["etag"].startswith('W/"')
+    assert headers["cache-control"] == "private, no-cache"
+    status, headers, body = call(json_app(b'{"a": 1}'), headers["etag"])
+    assert status == 304 and body == b""
+
+
+def test_route_etag_is_kept_but_made_weak():
+    status, headers, _ = call(json_app(b"[]", [(b"etag", b'"abc"')]))
+    assert headers["etag"] == 'W/"abc"'
+    assert call(json_app(b"[]", [(b"etag", b'"abc"')]), '"abc"')[0] == 304
+
+
+def test_etag_matching():
+    etag = version_etag("history", "AAPL", 3, 1700000000000, 101.5)
+    assert etag == version_etag("history", "AAPL", 3, 1700000000000, 101.5)
+    assert etag != version_etag("history", "AAPL", 3, 1700000000000, 101.6)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(etag[2:], etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+
+
+def test_history_etag_changes_when_only_last_bar_volume_changes(monkeypatch):
+    from app.routers import historical
+
+    bars = [{"t": 0, "o": 1, "h": 2, "l": 1, "c": 2, "v": 100},
+            {"t": 86_400_000, "o": 2, "h": 3, "l": 2, "c": 3, "v": 100}]
+
+    class FakeCache:
+        def series(self, symbol, timespan, from_date, to_date):
+            return list(bars), 7, 0
+
+    monkeypatch.setattr(historical, "bar_cache", FakeCache())
+    monkeypatch.setattr(historical, "slice_bars", lambda bars, from_date, to_date: bars)
+    _, before = historical._cached_bars("AAPL", "day", "1970-01-01", "1970-01-02")
+    bars[-1] = {**bars[-1], "v": 5000}
+    _, after = historical._cached_bars("AAPL", "day", "1970-01-01", "1970-01-02")
+    assert version_etag("history", *before) != version_etag("history", *after)
@@ -0,0 +1,93 @@
+"""
+Tests for the incremental indicator engine on top of the bar cache.
+
+Results served from cached, incrementally extended series must match a fresh computation over the same bars.
+"""
+from datetime import date, timedelta
+import pytest
+from app.core.historical_data import BarCache, date_to_ms
+from app.core.indicators import IndicatorEngine, _Indicator, _WindowIndicator, parse_indicator
+
+NAMES = ["sma_3", "ema_5", "rsi_5", "macd_3_6_3", "bbands_5_2"]
+
+
+class FakeUpstream:
+    """Daily bars served like Polygon: every bar of the requested range, with closes that can be revised."""
+    def __init__(self, start: date, days: int):
+        self.bars = {}
+        for i in range(days):
+            day = start + timedelta(days=i)
+            close = 100.0 + i + (i % 3) * 2.5
+            self.bars[day.isoformat()] = {"t": date_to_ms(day.isoformat()), "o": close - 1, "h": close + 1,
+                                          "l": close - 2, "c": close, "v": 1000.0}
+
+    def __call__(self, symbol, timespan, from_date, to_date):
+        return [dict(bar) for day, bar in sorted(self.bars.items()) if from_date <= day <= to_date]
+
+
+def assert_same(cached, expected):
+    assert cached["t"] == expected["t"]
+    for name, outputs in expected["indicators"].items():
+        for output, values in outputs.items():
+            assert cached["indicators"][name][output] == pytest.approx(values, nan_ok=True), (name, output)
+
+
+def fresh(upstream, from_date, to_date):
+    return IndicatorEngine(BarCache(fetch=upstream, ttl=0)).compute("TEST", "day", NAMES, from_date, to_date)
+
+
+def test_forward_extension_matches_fresh_compute():
+    upstream = FakeUpstream(date(2024, 1, 1), 40)
+    engine = IndicatorEngine(BarCache(fetch=upstream, ttl=0))
+    engine.compute("TEST", "day", NAMES, "2024-01-01", "2024-01-10")
+    cached = engine.compute("TEST", "day", NAMES, "2024-01-01", "2024-01-31")
+    assert_same(cached, fresh(upstream, "2024-01-01", "2024-01-31"))
+
+
+def test_backward_extension_matches_fresh_compute():
+    upstream = FakeUpstream(date(2024, 1, 1), 40)
+    engine = IndicatorEngine(BarCache(fetch=upstream, ttl=0))
+    engine.compute("TEST", "day", NAMES, "2024-01-10", "2024-01-20")
+    cached = engine.compute("TEST", "day", NAMES, "2024-01-01", "2024-01-20")
+    expected = fresh(upstream, "2024-01-01", "2024-01-20")
+    assert_same(cached, expected)
+    assert cached["indicators"]["sma_3"]["sma"][2] == pytest.approx(sum(upstream.bars[f"2024-01-0{d}"]["c"] for d in (1, 2, 3)) / 3)
+
+
+def test_revised_last_bar_is_refetched():
+    today = date.today()
+    upstream = FakeUpstream(today - timedelta(days=29), 30)
+    cache = BarCache(fetch=upstream, ttl=0)
+    engine = IndicatorEngine(cache)
+    from_date, to_date = (today - timedelta(days=29)).isoformat(), today.isoformat()
+    engine.compute("TEST", "day", NAMES, from_date, to_date)
+
+    # The partial bar for today moves, and a new bar arrives for a later request.
+    upstream.bars[to_date]["c"] = 120.0
+    bars, _, _ = cache.series("TEST", "day", from_date, to_date)
+    assert bars[-1]["c"] == 120.0
+    assert_same(engine.compute("TEST", "day", NAMES, from_date, to_date), fresh(upstream, from_date, to_date))
+
+    upstream.bars[to_date]["c"] = 95.0
+    tomorrow = (today + timedelta(days=1)).isoformat()
+    upstream.bars[tomorrow] = dict(upstream.bars[to_date], t=date_to_ms(tomorrow), c=97.0)
+    assert_same(engine.compute("TEST", "day", NAMES, from_date, tomorrow), fresh(upstream, from_date, tomorrow))
+
+
+def test_bar_cache_evicts_least_recently_used_series():
+    upstream = FakeUpstream(date(2024, 1, 1), 10)
+    cache = BarCache(fetch=upstream, ttl=0, max_series=2)
+    for symbol in ("A", "B", "A", "C"):
+        cache.series(symbol, "day", "2024-01-01", "2024-01-10")
+    assert cache.peek("A", "day", "2024-01-01", "2024-01-10") is not None
+    assert cache.peek("B", "day", "2024-01-01", "2024-01-10") is None
+    assert cache.peek("C", "day", "2024-01-01", "2024-01-10") is not None
+
+
+def test_indicator_bases_are_abstract():
+    with pytest.raises(TypeError):
+        _Indicator()
+    with pytest.raises(TypeError):
+        _WindowIndicator(5)
+    for name in ("sma_5", "ema_5", "rsi_14", "macd", "bbands_20_2"):
+        parse_indicator(name)
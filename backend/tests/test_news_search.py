@@ -0,0 +1,61 @@
+from app.core.news_search import NewsSearchIndex, tokenize
+from app.core.news_store import NewsStore
+
+
+def article(article_id, headline, summary="", related="", ts=1_700_000_000):
+    return {"id": article_id, "datetime": ts, "headline": headline, "summary": summary, "related": related}
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("The FDA approval of Acme's drug") == ["fda", "approval", "acme's", "drug"]
+
+
+def test_bm25_ranks_headline_and_rare_terms_higher():
+    index = NewsSearchIndex()
+    index.add("ACME", [
+        article(1, "Market update", "Acme mentions fda approval in passing among many other words here"),
+        article(2, "FDA approval for Acme drug"),
+        article(3, "Acme quarterly earnings"),
+        article(4, "FDA meeting scheduled"),
+    ])
+    assert ids(index.search("fda approval")) == [2, 1, 4]
+    assert index.search("fda approval")[0]["score"] > index.search("fda approval")[1]["score"]
+    assert index.search("the") == []
+    assert index.search("merger") == []
+
+
+def test_symbol_and_date_filters():
+    index = NewsSearchIndex()
+    index.add("AAPL", [article(1, "Earnings beat", related="AAPL", ts=100),
+                       article(2, "Earnings miss", related="AAPL,MSFT", ts=200)])
+    index.add("GOOG", [article(3, "Earnings in line", ts=300)])
+    assert sorted(ids(index.search("earnings", symbols=["msft"]))) == [2]
+    assert sorted(ids(index.search("earnings", symbols=["GOOG", "AAPL"]))) == [1, 2, 3]
+    assert sorted(ids(index.search("earnings", from_ts=150, to_ts=250))) == [2]
+
+
+def test_remove_keeps_articles_still_cached_under_another_symbol():
+    index = NewsSearchIndex()
+    shared = article(1, "Chip supply deal", related="AAPL,NVDA")
+    index.add("AAPL", [shared, article(2, "Chip shortage")])
+    index.add("NVDA", [shared])
+    index.remove("AAPL", [shared, article(2, "Chip shortage")])
+    assert ids(index.search("chip")) == [1]
+    index.remove("NVDA", [shared])
+    assert len(index) == 0
+    assert index.search("chip") == []
+
+
+def test_refresh_drops_evicted_articles_from_index():
+    batches = [[article(n, f"Story {n} earnings", ts=1_700_000_000 + n) for n in range(3)],
+               [article(n, f"Story {n} earnings", ts=1_700_000_000 + n) for n in range(3, 5)]]
+    index = NewsSearchIndex()
+    store = NewsStore(fetch=lambda symbol, since: batches.pop(0), ttl=0, max_per_symbol=3, index=index)
+    store.refresh("ACME")
+    store.refresh("ACME")
+    assert len(index) == 3
+    assert sorted(ids(index.search("earnings"))) == [2, 3, 4]
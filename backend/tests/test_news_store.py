@@ -0,0 +1,103 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import news_store as store_module
+from app.core.news_search import NewsSearchIndex
+from app.core.news_store import NewsStore, decode_cursor, encode_cursor
+from app.routers import news as news_router
+
+
+def article(article_id, ts, headline="Quarterly earnings beat"):
+    return {"id": article_id, "datetime": ts, "headline": headline, "url": f"https://example.com/{article_id}"}
+
+
+class FakeFinnhub:
+    def __init__(self, articles):
+        self.articles = articles  # symbol -> articles
+        self.calls = []
+
+    def __call__(self, symbol, from_date):
+        self.calls.append((symbol, from_date))
+        return list(self.articles.get(symbol, []))
+
+
+def test_cursor_round_trip():
+    a, older = article(7, 1_700_000_000), article(3, 1_699_999_000)
+    key = decode_cursor(encode_cursor(a))
+    assert encode_cursor(a) == "1700000000:7"
+    assert key == (-1_700_000_000, -7)
+    assert key < decode_cursor(encode_cursor(older))
+    # A bare timestamp sorts after every article published at that time.
+    assert decode_cursor("1700000000") > key
+    with pytest.raises(ValueError):
+        decode_cursor("yesterday")
+
+
+def test_refresh_dedupes_and_pages():
+    fetch = FakeFinnhub({"AAPL": [article(i, 1_700_000_000 + i) for i in range(5)]})
+    store = NewsStore(fetch=fetch, ttl=0)
+    assert len(store.refresh("aapl")) == 5
+    fetch.articles["AAPL"].append(article(5, 1_700_000_005))
+    assert [a["id"] for a in store.refresh("AAPL")] == [5]
+    assert store.refresh("AAPL") == []
+
+    page, cursor = store.page("AAPL", limit=4)
+    assert [a["id"] for a in page] == [5, 4, 3, 2]
+    page, cursor = store.page("AAPL", limit=4, before=cursor)
+    assert [a["id"] for a in page] == [1, 0]
+    assert cursor is None
+
+
+def test_least_recently_used_symbols_are_evicted_from_store_and_index():
+    index = NewsSearchIndex()
+    fetch = FakeFinnhub({s: [article(n, 1_700_000_000 + n, f"{s} earnings")] for n, s in enumerate(["A", "B", "C"])})
+    store = NewsStore(fetch=fetch, max_symbols=2, index=index)
+    store.refresh("A")
+    store.refresh("B")
+    store.articles("A")  # touch A, so B is least recently used
+    store.refresh("C")
+    assert len(store) == 2
+    assert store.articles("B") == ([], [])
+    assert [a["id"] for a in store.articles("A")[0]] == [0]
+    assert len(index) == 2
+    assert index.search("earnings", symbols=["B"]) == []
+
+
+def test_invalid_cursor_is_rejected_without_refreshing(monkeypatch):
+    fetch = FakeFinnhub({"AAPL": [article(1, 1_700_000_000)]})
+    monkeypatch.setattr(news_router, "news_store", NewsStore(fetch=fetch))
+    app = FastAPI()
+    app.include_router(news_router.router)
+    client = TestClient(app)
+    response = client.get("/news/AAPL", params={"before": "not-a-cursor"})
+    assert response.status_code == 400
+    assert fetch.calls == []
+    response = client.get("/news/AAPL")
+    assert response.status_code == 200
+    assert [a["id"] for a in response.json()["news"]] == [1]
+
+
+def test_merged_feed_pages_without_duplicates_or_gaps():
+    # Interleaved timestamps, a timestamp shared across symbols, and one article cross-posted under both.
+    aapl = [article(n, 1_700_000_000 + 10 * n) for n in range(10)]
+    msft = [article(100 + n, 1_700_000_005 + 10 * n) for n in range(10)] + [article(200, 1_700_000_050)]
+    shared = article(300, 1_700_000_033)
+    fetch = FakeFinnhub({"AAPL": aapl + [shared], "MSFT": msft + [shared], "EMPTY": []})
+    store = NewsStore(fetch=fetch)
+    store.refresh_many(["AAPL", "MSFT", "EMPTY"])
+
+    expected = sorted(aapl + msft + [shared], key=lambda a: (-a["datetime"], -a["id"]))
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.merged_page(["aapl", "MSFT", "EMPTY", "AAPL"], limit=4, before=cursor)
+        assert len(page) <= 4
+        seen.extend(a["id"] for a in page)
+        if cursor is None:
+            break
+    assert seen == [a["id"] for a in expected]
+
+
+def test_global_feed_symbols_merges_configured_and_watched(monkeypatch):
+    monkeypatch.setattr(store_module, "GLOBAL_NEWS_SYMBOLS", ["SPY", "AAPL"])
+    monkeypatch.setattr(store_module, "get_watched_symbols", lambda db: ["AAPL", "MSFT"])
+    assert store_module.global_feed_symbols(None) == ["SPY", "AAPL", "MSFT"]
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from app.core import price_stream
+from app.core.price_stream import PriceFeed, PriceStreamHub, ReplayFeed, Subscription
+
+
+BARS = {"AAPL": [{"c": 100.0 + i, "v": 10, "t": i} for i in range(5)]}
+
+
+class FailingFeed(PriceFeed):
+    async def updates(self, symbol):
+        raise RuntimeError("no bars")
+        yield
+
+
+def test_price_feed_is_abstract():
+    with pytest.raises(TypeError):
+        PriceFeed()
+
+
+def test_one_feed_fans_out_to_every_subscriber():
+    async def scenario():
+        hub = PriceStreamHub(ReplayFeed(BARS, interval=0.01))
+        first, second = Subscription(), Subscription()
+        hub.subscribe(first, ["aapl"])
+        hub.subscribe(second, ["AAPL"])
+        assert len(hub._tasks) == 1
+        assert hub.stats() == {"AAPL": 2}
+        await asyncio.sleep(0.2)
+        # Neither client read anything, so each mailbox holds only the newest update.
+        for subscription in (first, second):
+            batch = await subscription.get()
+            assert batch == [{"symbol": "AAPL", "price": 104.0, "size": 10, "t": 4}]
+            assert subscription.conflated == 4
+
+        hub.unsubscribe(first)
+        assert hub.stats() == {"AAPL": 1}
+        hub.unsubscribe(second, ["AAPL"])
+        await asyncio.sleep(0)
+        assert hub.stats() == {}
+        assert hub._tasks == {}
+
+    asyncio.run(scenario())
+
+
+def test_late_subscriber_gets_latest_price():
+    async def scenario():
+        hub = PriceStreamHub(ReplayFeed(BARS, interval=0.05))
+        early, late = Subscription(), Subscription()
+        hub.subscribe(early, ["AAPL"])
+        await early.get()
+        hub.subscribe(late, ["AAPL"])
+        assert (await late.get())[0]["price"] == 100.0
+        hub.unsubscribe(early)
+        hub.unsubscribe(late)
+
+    asyncio.run(scenario())
+
+
+def test_failed_feed_notifies_and_detaches_subscribers():
+    async def scenario():
+        hub = PriceStreamHub(FailingFeed())
+        subscription = Subscription()
+        hub.subscribe(subscription, ["AAPL"])
+        batch = await asyncio.wait_for(subscription.get(), timeout=1)
+        assert batch[0]["symbol"] == "AAPL"
+        assert batch[0]["price"] is None
+        assert "no bars" in batch[0]["error"]
+        assert subscription.symbols == set()
+        assert hub.stats() == {}
+        assert hub._tasks == {}
+
+    asyncio.run(scenario())
+
+
+def test_polling_outage_is_logged_once(monkeypatch, caplog):
+    outage = {"on": True}
+
+    def get_last_trade(symbol):
+        if outage["on"]:
+            raise ConnectionError("upstream down")
+        return {"symbol": symbol, "price": 1.0, "t": 0}
+
+    monkeypatch.setattr(price_stream, "get_last_trade", get_last_trade)
+
+    async def scenario():
+        hub = PriceStreamHub(price_stream.PolygonPollingFeed(interval=0.01))
+        subscription = Subscription()
+        hub.subscribe(subscription, ["AAPL", "MSFT"])
+        await asyncio.sleep(0.2)
+        outage["on"] = False
+        batch = await asyncio.wait_for(subscription.get(), timeout=1)
+        await asyncio.sleep(0.05)
+        hub.unsubscribe(subscription)
+        return batch
+
+    with caplog.at_level("INFO", logger="app.core.price_stream"):
+        assert asyncio.run(scenario())[0]["price"] == 1.0
+    messages = [r.getMessage() for r in caplog.records]
+    assert len([m for m in messages if "failing" in m]) == 1
+    assert messages.count("Price polling recovered") == 1
@@ -0,0 +1,79 @@
+import pytest
+from app.core import ticker_index
+from app.core.ticker_index import TickerIndex, fetch_ticker_reference, get_ticker_index, refresh_ticker_index
+
+
+TICKERS = [
+    {"ticker": "AAPL", "name": "Apple Inc."},
+    {"ticker": "AAP", "name": "Advance Auto Parts Inc."},
+    {"ticker": "AAPB", "name": "GraniteShares 2x Long AAPL Daily ETF"},
+    {"ticker": "MSFT", "name": "Microsoft Corporation"},
+    {"ticker": "NVDA", "name": "NVIDIA Corporation"},
+    {"ticker": "GOOGL", "name": "Alphabet Inc. Class A"},
+    {"ticker": "AMZN", "name": "Amazon.com Inc."},
+    {"ticker": "BAC", "name": "Bank of America Corporation"},
+    {"ticker": "ORCL", "name": "Oracle Corporation"},
+    {"ticker": "WMT", "name": "Walmart Inc."},
+    {"ticker": "aapl", "name": "Duplicate"},
+]
+
+
+def symbols(results):
+    return [r["symbol"] for r in results]
+
+
+def test_exact_symbol_ranks_above_prefix_completions():
+    index = TickerIndex(TICKERS)
+    assert len(index) == 10
+    assert symbols(index.search("aap")) == ["AAP", "AAPB", "AAPL"]
+    results = index.search("AAPL")
+    assert results[0]["symbol"] == "AAPL" and results[0]["score"] == 100.0
+
+
+def test_company_name_tokens_match_in_any_order():
+    index = TickerIndex(TICKERS)
+    assert symbols(index.search("apple")) == ["AAPL"]
+    assert symbols(index.search("america bank")) == ["BAC"]
+    assert index.search("  ") == []
+
+
+def test_fuzzy_match_finds_misspelled_names():
+    index = TickerIndex(TICKERS)
+    assert symbols(index.search("microsft")) == ["MSFT"]
+    assert symbols(index.search("walmrt")) == ["WMT"]
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+def test_rate_limited_pages_are_retried_without_losing_earlier_pages(monkeypatch):
+    responses = [
+        FakeResponse(200, {"results": TICKERS[:5], "next_url": "https://api.polygon.io/next?cursor=1"}),
+        FakeResponse(429, headers={"Retry-After": "2"}),
+        FakeResponse(429),
+        FakeResponse(200, {"results": TICKERS[5:]}),
+    ]
+    sleeps = []
+    monkeypatch.setattr(ticker_index.requests, "get", lambda url: responses.pop(0), raising=False)
+    monkeypatch.setattr(ticker_index.time, "sleep", sleeps.append)
+    assert fetch_ticker_reference() == TICKERS
+    assert sleeps == [2.0, ticker_index.TICKER_FETCH_BACKOFF_SECONDS * 2]
+
+
+def test_failed_refresh_keeps_previous_index(monkeypatch):
+    previous = TickerIndex(TICKERS)
+    monkeypatch.setattr(ticker_index, "_index", previous)
+    monkeypatch.setattr(ticker_index, "TICKER_FETCH_MAX_RETRIES", 1)
+    monkeypatch.setattr(ticker_index.requests, "get", lambda url: FakeResponse(429), raising=False)
+    monkeypatch.setattr(ticker_index.time, "sleep", lambda seconds: None)
+    with pytest.raises(Exception):
+        refresh_ticker_index()
+    assert get_ticker_index() is previous